@@ -1,19 +1,81 @@
 from rest_framework import serializers
 
 from Account.models import Dataset
+from utils.ingest_formats import COMPRESSION_EXTENSIONS, DATA_EXTENSIONS, get_data_extension
+
+# File types that can be ingested, optionally compressed
+SUPPORTED_UPLOAD_EXTENSIONS = DATA_EXTENSIONS
+
+
+def validate_upload_filename(value):
+    """
+    Validate that an uploaded file has a supported type, looking through compression extensions.
+    """
+    extension = get_data_extension(value)
+    # The contents of .zip archives are checked when they are processed
+    if extension is not None and extension not in SUPPORTED_UPLOAD_EXTENSIONS:
+        raise serializers.ValidationError(
+            f"Unsupported file type: {extension}. Supported types: {', '.join(SUPPORTED_UPLOAD_EXTENSIONS)}, "
+            f"optionally compressed as {', '.join(COMPRESSION_EXTENSIONS)}"
+        )
+    return value
+
+
+def validate_upload_key(value):
+    """
+    Validate that a storage key names an object staged by the upload API.
+    """
+    if not value.startswith("uploads/") or ".." in value:
+        raise serializers.ValidationError("Invalid upload key")
+    return value
 
 
 class DatasetCreateSerializer(serializers.ModelSerializer):
     # Add a file field that's not part of the model
     file = serializers.FileField(write_only=True, required=False)
+    cluster_by = serializers.CharField(
+        write_only=True,
+        required=False,
+        allow_blank=True,
+        help_text="Column to cluster rows by in the stored Parquet file, e.g. a low-cardinality category",
+    )
+    partition_by_date = serializers.BooleanField(
+        write_only=True,
+        required=False,
+        allow_null=True,
+        help_text="Store the dataset partitioned by year/month of its date column (defaults to large files only)",
+    )
+    downcast_numeric = serializers.BooleanField(
+        write_only=True,
+        required=False,
+        allow_null=True,
+        help_text="Store integer columns in the narrowest type that holds their values (defaults to true)",
+    )
 
     class Meta:
         model = Dataset
-        fields = ["name", "description", "file"]
+        fields = ["name", "description", "file", "cluster_by", "partition_by_date", "downcast_numeric"]
+
+    def validate_file(self, value):
+        validate_upload_filename(value.name)
+        return value
 
     def create(self, validated_data):
         # Remove the file from validated_data as it's not a model field
         file = validated_data.pop("file", None)
+        # Ingest options are kept in the metadata for the background task
+        ingest_options = {}
+        cluster_by = validated_data.pop("cluster_by", "")
+        if cluster_by:
+            ingest_options["cluster_by"] = cluster_by
+        partition_by_date = validated_data.pop("partition_by_date", None)
+        if partition_by_date is not None:
+            ingest_options["partition_by_date"] = partition_by_date
+        downcast_numeric = validated_data.pop("downcast_numeric", None)
+        if downcast_numeric is not None:
+            ingest_options["downcast_numeric"] = downcast_numeric
+        if ingest_options:
+            validated_data["metadata"] = {"ingest_options": ingest_options}
         # Create the dataset instance
         dataset = Dataset.objects.create(**validated_data)
         return dataset
@@ -63,3 +125,66 @@ class DatasetSourceSerializer(serializers.Serializer):
             raise serializers.ValidationError("Only one of dataset_id or file_name should be provided")
 
         return data
+
+
+class PresignedUploadSerializer(serializers.Serializer):
+    """
+    Serializer for validating requests to start a direct-to-storage upload.
+    """
+
+    filename = serializers.CharField(help_text="Name of the file to upload")
+    size = serializers.IntegerField(min_value=1, help_text="Size of the file in bytes")
+
+    def validate_filename(self, value):
+        return validate_upload_filename(value)
+
+
+class ResumableUploadSerializer(PresignedUploadSerializer):
+    """
+    Serializer for validating requests to start a resumable, chunked upload.
+    """
+
+
+class UploadedPartSerializer(serializers.Serializer):
+    part_number = serializers.IntegerField(min_value=1, max_value=10000)
+    etag = serializers.CharField()
+
+
+class PresignedUploadCompleteSerializer(DatasetCreateSerializer):
+    """
+    Serializer for completing a direct-to-storage upload and creating its dataset.
+    """
+
+    upload_id = serializers.CharField(write_only=True, help_text="Upload id returned when the upload was started")
+    key = serializers.CharField(write_only=True, help_text="Staging key returned when the upload was started")
+    parts = UploadedPartSerializer(many=True, write_only=True, help_text="Part numbers and ETags of the parts")
+
+    class Meta(DatasetCreateSerializer.Meta):
+        fields = DatasetCreateSerializer.Meta.fields + ["upload_id", "key", "parts"]
+
+    def validate_key(self, value):
+        # Only objects staged by the upload API may be completed and processed
+        return validate_upload_key(value)
+
+    def validate_parts(self, value):
+        if not value:
+            raise serializers.ValidationError("At least one part is required")
+        return value
+
+    def create(self, validated_data):
+        for field in ("upload_id", "key", "parts"):
+            validated_data.pop(field, None)
+        return super().create(validated_data)
+
+
+class PresignedUploadAbortSerializer(serializers.Serializer):
+    """
+    Serializer for validating requests to cancel a direct-to-storage upload.
+    """
+
+    upload_id = serializers.CharField(help_text="Upload id returned when the upload was started")
+    key = serializers.CharField(help_text="Staging key returned when the upload was started")
+
+    def validate_key(self, value):
+        # Only objects staged by the upload API may be aborted
+        return validate_upload_key(value)
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from Account.models import Dataset
+from utils.frame_cache import invalidate_dataset_frame
+
+
+@receiver(post_save, sender=Dataset)
+@receiver(post_delete, sender=Dataset)
+def invalidate_dataset_cache(sender, instance, **kwargs):
+    """
+    Drop cached DataFrames when a dataset is re-processed or deleted.
+    Soft deletes go through save(), so post_save covers them as well.
+    """
+    invalidate_dataset_frame(instance.object_id)
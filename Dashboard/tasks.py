@@ -1,63 +1,336 @@
+import copy
 import logging
 import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 from celery import shared_task
 
+from django.conf import settings
+from django.db import connection
 from django.shortcuts import get_object_or_404
 
 from Account.models import Dataset, User
 from utils.aggregate import extract_dataset_metadata
-from utils.aws_config import upload_dataset_to_s3
+from utils.aws_config import get_content_key, hash_file, upload_dataset_to_s3
+from utils.excel_ingest import list_excel_sheets
+from utils.ingest_formats import decompress_upload
+from utils.storage import get_storage_backend
 
 logger = logging.getLogger(__name__)
 
 
+def find_reusable_dataset(content_key, dataset_id):
+    """
+    Find a processed dataset whose stored Parquet was converted from identical content.
+
+    Args:
+        content_key (str): The content key of the new upload
+        dataset_id (str): UUID of the dataset being processed, excluded from the search
+
+    Returns:
+        Dataset: The matching dataset, or None if there is none or its object is gone
+    """
+    existing = (
+        Dataset.objects.filter(status="READ_COMPLETE", metadata__file_info__content_hash=content_key)
+        .exclude(object_id=dataset_id)
+        .first()
+    )
+    if existing is None:
+        return None
+
+    # Make sure the shared object is still there before pointing another dataset at it
+    file_info = existing.metadata["file_info"]
+    key = file_info["partitions"][0]["s3_path"] if file_info.get("partitions") else file_info["s3_path"]
+    try:
+        get_storage_backend().get_version(key)
+    except Exception as e:
+        logger.warning(f"Stored object {key} of dataset {existing.object_id} is not available: {str(e)}")
+        return None
+    return existing
+
+
+def get_staging_key(clean_filename):
+    """
+    Get a unique object storage key to stage an upload under until it is processed.
+
+    Args:
+        clean_filename (str): Cleaned filename
+
+    Returns:
+        str: The staging key, under the "uploads/" prefix
+    """
+    return f"uploads/{uuid.uuid4().hex}/{clean_filename}"
+
+
+def stage_upload(file_path, clean_filename):
+    """
+    Move a local upload into object storage so a worker on any host can process it.
+
+    The local file is removed once it is stored.
+
+    Args:
+        file_path (str): The local path of the upload
+        clean_filename (str): Cleaned filename
+
+    Returns:
+        str: The key of the staged object
+    """
+    staged_key = get_staging_key(clean_filename)
+    get_storage_backend().upload_file(file_path, staged_key)
+    os.remove(file_path)
+    return staged_key
+
+
+def download_staged_upload(staged_key, clean_filename):
+    """
+    Download a file staged in object storage into the upload directory.
+
+    Args:
+        staged_key (str): The key of the staged object
+        clean_filename (str): Cleaned filename, kept as the suffix so the file type is preserved
+
+    Returns:
+        str: The local path of the downloaded file
+    """
+    os.makedirs(settings.UPLOAD_TEMP_DIR, exist_ok=True)
+    fd, file_path = tempfile.mkstemp(dir=settings.UPLOAD_TEMP_DIR, suffix=f"_{clean_filename}")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            get_storage_backend().download(staged_key, f)
+    except Exception:
+        os.remove(file_path)
+        raise
+    return file_path
+
+
+def get_sheets_to_ingest(file_path, clean_filename, ingest_options):
+    """
+    Get the workbook sheets an upload is ingested from.
+
+    Args:
+        file_path (str): The local path of the upload
+        clean_filename (str): Cleaned filename, used to detect the file type
+        ingest_options (dict): The dataset's ingest options
+
+    Returns:
+        list: Sheet names, or [None] for files that are not Excel workbooks
+    """
+    if os.path.splitext(clean_filename.lower())[1] not in [".xlsx", ".xls"]:
+        return [None]
+    # Re-ingests of a single sheet's dataset only read that sheet
+    if ingest_options.get("sheet_name"):
+        return [ingest_options["sheet_name"]]
+    return list_excel_sheets(file_path)
+
+
+def ingest_dataset_file(dataset, file_path, clean_filename, file_hash, sheet_name=None, original_filename=None):
+    """
+    Convert a file into a dataset's stored Parquet and metadata, and mark the dataset complete.
+
+    Args:
+        dataset (Dataset): The dataset to fill in; saved once the file has been converted
+        file_path (str): The local path of the upload
+        clean_filename (str): Cleaned filename
+        file_hash (str): SHA-256 of the upload
+        sheet_name (str, optional): The sheet of an Excel workbook to convert
+        original_filename (str, optional): Name of the upload as received, if it was decompressed
+
+    Returns:
+        Dataset: The dataset whose Parquet was reused for identical content, or None
+    """
+    # Re-ingests reuse the CSV dialect detected the first time
+    dialect = (dataset.metadata or {}).get("csv_dialect")
+    ingest_options = dict((dataset.metadata or {}).get("ingest_options", {}))
+    if sheet_name is not None:
+        ingest_options["sheet_name"] = sheet_name
+    downcast_numeric = ingest_options.get("downcast_numeric", True)
+
+    # Identical uploads map to the same content key, checked before any conversion work
+    content_key = get_content_key(
+        file_hash,
+        cluster_by=ingest_options.get("cluster_by"),
+        partition_by_date=ingest_options.get("partition_by_date"),
+        sheet_name=sheet_name,
+        # Only the opt-out changes the output, so datasets converted with the default keep their key
+        downcast_numeric=None if downcast_numeric else False,
+    )
+    existing = find_reusable_dataset(content_key, dataset.object_id)
+
+    if existing is not None:
+        logger.info(f"Dataset {dataset.object_id} has the same content as {existing.object_id}, reusing its Parquet")
+        metadata = copy.deepcopy(existing.metadata)
+        metadata.pop("workbook_sheets", None)
+    else:
+        # Upload file to S3/Minio and extract metadata
+        result = upload_dataset_to_s3(
+            file_path,
+            clean_filename,
+            extract_metadata=True,
+            dialect=dialect,
+            cluster_by=ingest_options.get("cluster_by"),
+            partition_by_date=ingest_options.get("partition_by_date"),
+            content_key=content_key,
+            sheet_name=sheet_name,
+            downcast_numeric=downcast_numeric,
+        )
+        metadata = result["metadata"]
+        # Add file information to metadata
+        metadata["file_info"] = {
+            "url": result["url"],
+            "filename": result["filename"],
+            "s3_path": result["s3_path"],
+            "content_hash": result["content_hash"],
+        }
+        if "partitions" in result:
+            # Readers scan only the partitions a query's time range needs
+            metadata["file_info"].update(
+                {
+                    "layout": "hive",
+                    "partition_column": result["partition_column"],
+                    "partitions": result["partitions"],
+                }
+            )
+
+    # Update dataset with metadata and status
+    metadata["ingest_options"] = ingest_options
+    metadata["file_info"]["original_filename"] = original_filename or clean_filename
+    dataset.metadata = metadata
+    dataset.status = "READ_COMPLETE"
+    dataset.save()
+    return existing
+
+
+def ingest_sheet_dataset(dataset, file_path, clean_filename, file_hash, sheet_name, original_filename=None):
+    """
+    Ingest one extra sheet of a workbook as its own dataset, in a worker thread.
+
+    Args:
+        dataset (Dataset): An unsaved dataset for the sheet; only saved if the sheet is ingested
+        file_path (str): The local path of the workbook
+        clean_filename (str): Cleaned filename
+        file_hash (str): SHA-256 of the workbook
+        sheet_name (str): The sheet to ingest
+        original_filename (str, optional): Name of the upload as received, if it was decompressed
+
+    Returns:
+        dict: The sheet name and its dataset id, or the error if the sheet could not be ingested
+    """
+    try:
+        ingest_dataset_file(
+            dataset, file_path, clean_filename, file_hash, sheet_name=sheet_name, original_filename=original_filename
+        )
+        return {"sheet_name": sheet_name, "dataset_id": str(dataset.object_id)}
+    except Exception as e:
+        logger.warning(f"Failed to ingest sheet {sheet_name} of {clean_filename}: {str(e)}")
+        return {"sheet_name": sheet_name, "dataset_id": None, "error": str(e)}
+    finally:
+        # Each thread opens its own database connection
+        connection.close()
+
+
 @shared_task
-def process_dataset_file(file_path, clean_filename, dataset_id):
+def process_dataset_file(file_path, clean_filename, dataset_id, content_hash=None, staged_key=None):
     """
     Process a dataset file in the background:
-    1. Upload the file to S3/Minio
+    1. Upload the file to S3/Minio, unless identical content was already processed
     2. Extract metadata
     3. Update the dataset with the metadata
 
+    Each extra sheet of an Excel workbook is converted in parallel into a dataset of its own.
+
     Args:
-        file_path (str): Path to the temporary file
+        file_path (str): Path to a local file, or None if the file is staged in object storage
         clean_filename (str): Cleaned filename
         dataset_id (str): UUID of the dataset to update
+        content_hash (str, optional): SHA-256 of the file, if computed while receiving it
+        staged_key (str, optional): Key of the file in object storage. Uploads are staged there
+            so that workers need no shared volume with the web server; the staged object is
+            deleted once the dataset has been processed.
     """
+    data_path = None
     try:
         logger.info(f"Starting background processing of dataset {dataset_id}")
 
-        # Upload file to S3/Minio and extract metadata
-        result = upload_dataset_to_s3(file_path, clean_filename, extract_metadata=True)
+        if staged_key is not None:
+            file_path = download_staged_upload(staged_key, clean_filename)
+            logger.info(f"Downloaded staged upload {staged_key} to {file_path}")
 
         # Get the dataset
         dataset = Dataset.objects.get(object_id=dataset_id)
+        ingest_options = (dataset.metadata or {}).get("ingest_options", {})
 
-        # Update dataset with metadata and status
-        dataset.metadata = result["metadata"]
-        # Add file information to metadata
-        dataset.metadata["file_info"] = {
-            "url": result["url"],
-            "filename": result["filename"],
-            "s3_path": result["s3_path"],
-        }
-        dataset.status = "READ_COMPLETE"
-        dataset.save()
+        file_hash = content_hash or hash_file(file_path)
+
+        # Compressed uploads are expanded once, so every reader below sees a plain file
+        data_path, data_filename = decompress_upload(file_path, clean_filename)
+        sheets = get_sheets_to_ingest(data_path, data_filename, ingest_options)
+
+        # The first sheet fills this dataset; every other sheet of a workbook becomes a dataset of its own
+        sheet_datasets = [
+            Dataset(
+                name=f"{dataset.name} - {sheet_name}",
+                description=dataset.description,
+                owner_id=dataset.owner_id,
+                status="READ_PENDING",
+                metadata={"ingest_options": {**ingest_options, "sheet_name": sheet_name}},
+            )
+            for sheet_name in sheets[1:]
+        ]
+
+        with ThreadPoolExecutor(max_workers=settings.EXCEL_SHEET_WORKERS) as pool:
+            futures = [
+                pool.submit(
+                    ingest_sheet_dataset,
+                    sheet_dataset,
+                    data_path,
+                    data_filename,
+                    file_hash,
+                    sheet_name,
+                    original_filename=clean_filename,
+                )
+                for sheet_dataset, sheet_name in zip(sheet_datasets, sheets[1:])
+            ]
+            existing = ingest_dataset_file(
+                dataset, data_path, data_filename, file_hash, sheet_name=sheets[0], original_filename=clean_filename
+            )
+            sheet_results = [future.result() for future in futures]
+
+        if sheet_results:
+            dataset.metadata["workbook_sheets"] = [
+                {"sheet_name": sheets[0], "dataset_id": str(dataset.object_id)}
+            ] + sheet_results
+            dataset.save()
 
         logger.info(f"Successfully processed dataset {dataset_id}")
 
-        # Clean up the temporary file
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                logger.info(f"Removed temporary file {file_path}")
-            else:
-                logger.warning(f"Temporary file {file_path} not found for cleanup")
-        except Exception as e:
-            logger.warning(f"Failed to remove temporary file {file_path}: {str(e)}")
+        # Clean up the temporary files
+        for temp_path in {file_path, data_path}:
+            try:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                    logger.info(f"Removed temporary file {temp_path}")
+                else:
+                    logger.warning(f"Temporary file {temp_path} not found for cleanup")
+            except Exception as e:
+                logger.warning(f"Failed to remove temporary file {temp_path}: {str(e)}")
+
+        # The staged upload is no longer needed once the dataset is stored
+        if staged_key is not None:
+            try:
+                get_storage_backend().delete(staged_key)
+                logger.info(f"Removed staged upload {staged_key}")
+            except Exception as e:
+                logger.warning(f"Failed to remove staged upload {staged_key}: {str(e)}")
 
-        return {"success": True, "dataset_id": str(dataset_id), "file_url": result["url"]}
+        return {
+            "success": True,
+            "dataset_id": str(dataset_id),
+            "file_url": dataset.metadata["file_info"]["url"],
+            "deduplicated_from": str(existing.object_id) if existing is not None else None,
+            "sheet_datasets": [result["dataset_id"] for result in sheet_results if result["dataset_id"]],
+        }
 
     except Exception as e:
         logger.error(f"Error processing dataset {dataset_id}: {str(e)}")
@@ -70,14 +343,23 @@ def process_dataset_file(file_path, clean_filename, dataset_id):
         except Exception as inner_e:
             logger.error(f"Failed to update dataset status: {str(inner_e)}")
 
-        # Clean up the temporary file
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                logger.info(f"Removed temporary file {file_path} after error")
-            else:
-                logger.warning(f"Temporary file {file_path} not found for cleanup after error")
-        except Exception as cleanup_error:
-            logger.warning(f"Failed to remove temporary file {file_path} after error: {str(cleanup_error)}")
+        # Clean up the temporary files
+        for temp_path in {file_path, data_path} - {None}:
+            try:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                    logger.info(f"Removed temporary file {temp_path} after error")
+                else:
+                    logger.warning(f"Temporary file {temp_path} not found for cleanup after error")
+            except Exception as cleanup_error:
+                logger.warning(f"Failed to remove temporary file {temp_path} after error: {str(cleanup_error)}")
+
+        # The dataset is marked as failed and the task is not retried, so nothing will read the staged upload again
+        if staged_key is not None:
+            try:
+                get_storage_backend().delete(staged_key)
+                logger.info(f"Removed staged upload {staged_key} after error")
+            except Exception as cleanup_error:
+                logger.warning(f"Failed to remove staged upload {staged_key} after error: {str(cleanup_error)}")
 
         return {"success": False, "dataset_id": str(dataset_id), "error": str(e)}
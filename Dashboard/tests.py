@@ -1,3 +1,181 @@
-from django.test import TestCase
+from datetime import datetime
+from unittest import mock
 
-# Create your tests here.
+import polars as pl
+
+from django.test import SimpleTestCase
+
+from utils import aggregate
+from utils.aggregate import (
+    aggregate_top_n,
+    compute_bin_edges,
+    create_bin_expression,
+    parse_bin_spec,
+    perform_aggregations,
+    perform_axis_based_aggregation,
+)
+from utils.partitioned_storage import time_range_expression
+
+
+class TimeRangeExpressionTests(SimpleTestCase):
+    def setUp(self):
+        self.df = pl.DataFrame(
+            {
+                "t": [
+                    datetime(2024, 1, 31, 23, 30),
+                    datetime(2024, 2, 1),
+                    datetime(2024, 2, 29, 18),
+                    datetime(2024, 3, 1),
+                ]
+            }
+        )
+
+    def _filter(self, df, start=None, end=None):
+        return df.filter(time_range_expression("t", df.schema["t"], start, end))["t"].to_list()
+
+    def test_date_only_end_includes_the_whole_day(self):
+        self.assertEqual(
+            self._filter(self.df, "2024-02-01", "2024-02-29"), [datetime(2024, 2, 1), datetime(2024, 2, 29, 18)]
+        )
+
+    def test_utc_column(self):
+        df = self.df.with_columns(pl.col("t").dt.replace_time_zone("UTC"))
+        result = self._filter(df, "2024-02-01", "2024-02-29")
+        self.assertEqual(
+            [value.replace(tzinfo=None) for value in result], [datetime(2024, 2, 1), datetime(2024, 2, 29, 18)]
+        )
+
+    def test_utc_column_with_offset_bound(self):
+        df = self.df.with_columns(pl.col("t").dt.replace_time_zone("UTC"))
+        result = self._filter(df, start="2024-02-01T00:00:00+01:00")
+        self.assertEqual(len(result), 4)
+
+
+class PerformAggregationsTests(SimpleTestCase):
+    def test_failed_aggregations_are_reported_individually(self):
+        df = pl.DataFrame({"v": [1, 2, 1000]})
+        failing = {
+            # Fails when the output type is resolved
+            "length": lambda col: col.str.len_chars().sum(),
+            # Fails only when the data is read
+            "as_int8": lambda col: col.cast(pl.Int8).sum(),
+        }
+        with mock.patch.dict(aggregate.NUMERIC_AGGREGATIONS, failing):
+            result = perform_aggregations(df.lazy(), {"v": ["sum", "length", "as_int8", "max"], "missing": ["sum"]})
+
+        self.assertEqual(list(result), ["v"])
+        self.assertEqual(list(result["v"]), ["sum", "length", "as_int8", "max"])
+        self.assertEqual(result["v"]["sum"], 1003)
+        self.assertEqual(result["v"]["max"], 1000)
+        self.assertTrue(result["v"]["length"].startswith("Error: "))
+        self.assertTrue(result["v"]["as_int8"].startswith("Error: "))
+
+
+class TopNAggregationTests(SimpleTestCase):
+    def setUp(self):
+        # "Other" is a real value, and the largest
+        self.df = pl.DataFrame({"x": ["Other"] * 50 + ["a"] * 40 + ["b"] * 5 + ["c"] * 3, "y": [1] * 98})
+
+    def test_aggregate_top_n_keeps_a_real_other_value(self):
+        keys, agg_result, labels = aggregate_top_n(self.df.lazy(), "x", [pl.col("y").sum().alias("__y_0")], 2)
+
+        self.assertEqual(keys.rows(), [("Other", False), ("a", False), (None, True)])
+        self.assertEqual(labels, ["Other", "a", "Other (grouped)"])
+        sums = {(row["x"], row["__other"]): row["__y_0"] for row in agg_result.iter_rows(named=True)}
+        self.assertEqual(sums, {("Other", False): 50, ("a", False): 40, (None, True): 8})
+
+    def test_axis_aggregation_groups_the_rest(self):
+        result = perform_axis_based_aggregation(self.df.lazy(), "x", ["y"], y_axis_aggregations={"y": "sum"}, top_n=2)
+
+        self.assertEqual(result["chart_data"]["labels"], ["Other", "a", "Other (grouped)"])
+        self.assertEqual(result["chart_data"]["datasets"][0]["data"], [50, 40, 8])
+        self.assertEqual(result["metadata"]["x_axis"]["top_n"]["other_label"], "Other (grouped)")
+        self.assertEqual(result["metadata"]["num_rows"], 98)
+
+    def test_null_value_in_top_n(self):
+        df = pl.DataFrame({"x": ["b", None, "a", None, "c"], "y": [1, 2, 3, 4, 5]})
+        result = perform_axis_based_aggregation(df.lazy(), "x", ["y"], y_axis_aggregations={"y": "sum"}, top_n=2)
+
+        self.assertEqual(result["chart_data"]["labels"], [None, "c", "Other"])
+        self.assertEqual(result["chart_data"]["datasets"][0]["data"], [6, 5, 4])
+
+
+class NullLabelTests(SimpleTestCase):
+    def test_null_labels_are_matched_in_the_join(self):
+        df = pl.DataFrame({"x": ["b", None, "a", None], "y": [1, 2, 3, 4]})
+        result = perform_axis_based_aggregation(df.lazy(), "x", ["y"], y_axis_aggregations={"y": "sum"})
+
+        self.assertEqual(result["chart_data"]["labels"], [None, "a", "b"])
+        self.assertEqual(result["chart_data"]["datasets"][0]["data"], [6, 3, 1])
+
+
+class BinAggregationTests(SimpleTestCase):
+    def setUp(self):
+        self.lf = pl.DataFrame({"v": [float(i) for i in range(11)]}).lazy()
+
+    def test_parse_bin_spec(self):
+        self.assertEqual(parse_bin_spec("quartiles"), {"type": "quantile", "count": 4})
+        self.assertEqual(parse_bin_spec({"type": "width", "width": 5}), {"type": "width", "width": 5})
+        self.assertIsNone(parse_bin_spec("monthly"))
+        self.assertIsNone(parse_bin_spec(None))
+
+    def test_parse_bin_spec_rejects_invalid_specs(self):
+        for spec in [{"type": "width", "width": 0}, {"type": "count", "count": 2.5}, {"type": "unknown"}]:
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_bin_spec(spec)
+
+    def test_bin_edges_for_each_type(self):
+        cases = [
+            ({"type": "width", "width": 5}, [0.0, 5.0, 10.0]),
+            ({"type": "count", "count": 4}, [0.0, 2.5, 5.0, 7.5, 10.0]),
+            ({"type": "quantile", "count": 4}, [0.0, 2.5, 5.0, 7.5, 10.0]),
+            ({"type": "auto"}, [0.0, 10 / 3, 20 / 3, 10.0]),
+        ]
+        for spec, expected in cases:
+            with self.subTest(spec=spec):
+                edges = compute_bin_edges(self.lf, "v", spec)
+                self.assertEqual(len(edges), len(expected))
+                for edge, value in zip(edges, expected):
+                    self.assertAlmostEqual(edge, value)
+
+    def test_repeated_quantiles_are_merged(self):
+        lf = pl.DataFrame({"v": [1, 1, 1, 1, 9]}).lazy()
+        self.assertEqual(compute_bin_edges(lf, "v", {"type": "quantile", "count": 4}), [1.0, 9.0])
+
+    def test_constant_and_empty_columns(self):
+        self.assertEqual(compute_bin_edges(pl.DataFrame({"v": [5, 5, 5]}).lazy(), "v", {"type": "auto"}), [5.0, 5.0])
+        empty = pl.DataFrame({"v": [None, None]}, schema={"v": pl.Int64}).lazy()
+        self.assertEqual(compute_bin_edges(empty, "v", {"type": "auto"}), [])
+
+    def test_too_many_bins(self):
+        with self.assertRaises(ValueError):
+            compute_bin_edges(self.lf, "v", {"type": "width", "width": 0.001}, max_bins=100)
+
+    def test_create_bin_expression(self):
+        expression, labels = create_bin_expression("v", [0, 5, 10])
+        df = pl.DataFrame({"v": [0.0, 4.9, 5.0, 10.0, None]})
+
+        self.assertEqual(df.select(expression)["bin"].to_list(), [0, 0, 1, 1, None])
+        self.assertEqual(labels, ["[0, 5)", "[5, 10]"])
+
+    def test_empty_bins_are_charted(self):
+        df = pl.DataFrame({"v": [0, 1, 9, 10]})
+        result = perform_axis_based_aggregation(
+            df.lazy(),
+            "v",
+            ["v"],
+            x_axis_aggregations={"v": {"type": "count", "count": 3}},
+            y_axis_aggregations={"v": "count"},
+        )
+
+        self.assertEqual(result["chart_data"]["labels"], ["[0, 3.33333)", "[3.33333, 6.66667)", "[6.66667, 10]"])
+        self.assertEqual(result["chart_data"]["datasets"][0]["data"], [2, 0, 2])
+
+    def test_constant_column_has_one_bin(self):
+        df = pl.DataFrame({"v": [5, 5, 5]})
+        result = perform_axis_based_aggregation(
+            df.lazy(), "v", ["v"], x_axis_aggregations={"v": "bins"}, y_axis_aggregations={"v": "count"}
+        )
+
+        self.assertEqual(result["chart_data"]["labels"], ["[5, 5]"])
+        self.assertEqual(result["chart_data"]["datasets"][0]["data"], [3])
@@ -11,6 +11,25 @@ urlpatterns = [
     path("datasets/<uuid:dataset_id>/", dataset_detail_view, name="dataset-detail-page"),
     # API endpoints
     path("createdataset/", CraeteDatsetView.as_view(), name="create-dataset"),
+    path("api/uploads/presigned/", PresignedUploadView.as_view(), name="presigned-upload"),
+    path("api/uploads/presigned/complete/", PresignedUploadCompleteView.as_view(), name="presigned-upload-complete"),
+    path("api/uploads/presigned/abort/", PresignedUploadAbortView.as_view(), name="presigned-upload-abort"),
+    path("api/uploads/resumable/", ResumableUploadView.as_view(), name="resumable-upload"),
+    path(
+        "api/uploads/resumable/<str:upload_id>/",
+        ResumableUploadDetailView.as_view(),
+        name="resumable-upload-detail",
+    ),
+    path(
+        "api/uploads/resumable/<str:upload_id>/chunks/<int:index>/",
+        ResumableUploadChunkView.as_view(),
+        name="resumable-upload-chunk",
+    ),
+    path(
+        "api/uploads/resumable/<str:upload_id>/finalize/",
+        ResumableUploadFinalizeView.as_view(),
+        name="resumable-upload-finalize",
+    ),
     path("getdashboard/", GetDashboardView.as_view(), name="get-dashboard"),
     path("getData/", TestDashboardFuctions.as_view(), name="get-dataset"),
     path("aggregations/", DataAggregationView.as_view(), name="data-aggregations"),
@@ -19,4 +38,5 @@ urlpatterns = [
     path("dataset-status/<uuid:dataset_id>/", DatasetStatusView.as_view(), name="dataset-status"),
     path("api/datasets/<uuid:dataset_id>/", DatasetStatusView.as_view(), name="dataset-detail"),
     path("api/datasets/<uuid:dataset_id>/visualize/", DatasetVisualizationView.as_view(), name="dataset-visualize"),
+    path("api/cache-stats/", CacheStatsView.as_view(), name="cache-stats"),
 ]
@@ -1,4 +1,8 @@
+import hashlib
 import json
+import os
+import tempfile
+from io import BytesIO
 
 import polars as pl
 from rest_framework import status
@@ -8,6 +12,7 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from django.conf import settings
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.utils.decorators import method_decorator
@@ -21,10 +26,86 @@ from utils.aggregate import (
     perform_aggregations,
     perform_axis_based_aggregation,
 )
-from utils.aws_config import get_file_from_s3, upload_dataset_to_s3, upload_file_to_s3
+from utils.aws_config import (
+    abort_presigned_multipart_upload,
+    complete_presigned_multipart_upload,
+    create_presigned_multipart_upload,
+    get_file_from_s3,
+    upload_file_to_s3,
+)
+from utils.column_encoding import is_string_dtype
+from utils.frame_cache import get_dataset_frame, get_frame_cache_stats, scan_dataset
+from utils.hot_tier import get_hot_tier_stats
+from utils.parquet_cache import get_parquet_cache_stats
+from utils.partitioned_storage import time_range_expression
+from utils.resumable_upload import ChecksumMismatchError, get_resumable_upload_store
+from utils.storage import get_storage_backend
+
+from .serializers import (
+    AggregationRequestSerializer,
+    DatasetCreateSerializer,
+    DatasetSourceSerializer,
+    PresignedUploadAbortSerializer,
+    PresignedUploadCompleteSerializer,
+    PresignedUploadSerializer,
+    ResumableUploadSerializer,
+)
+from .tasks import get_staging_key, process_dataset_file, stage_upload
+
+
+def save_upload(file, clean_filename):
+    """
+    Save an uploaded file to a unique path in the upload directory, hashing it as it is written.
+
+    Args:
+        file (UploadedFile): The uploaded file
+        clean_filename (str): Cleaned filename, kept as the suffix so the file type is preserved
+
+    Returns:
+        tuple: The path of the saved file and its SHA-256 hex digest
+    """
+    os.makedirs(settings.UPLOAD_TEMP_DIR, exist_ok=True)
+    # A unique name keeps concurrent uploads of files with the same name apart
+    fd, file_path = tempfile.mkstemp(dir=settings.UPLOAD_TEMP_DIR, suffix=f"_{clean_filename}")
+    digest = hashlib.sha256()
+    with os.fdopen(fd, "wb") as f:
+        for chunk in file.chunks():
+            digest.update(chunk)
+            f.write(chunk)
+    return file_path, digest.hexdigest()
+
+
+def queue_dataset_upload(serializer, file):
+    """
+    Stage an uploaded file, create its dataset and queue it for background processing.
+
+    Args:
+        serializer (DatasetCreateSerializer): A validated serializer for the new dataset
+        file (UploadedFile): The uploaded file
+
+    Returns:
+        Dataset: The new dataset, with status READ_PENDING
+    """
+    # Trim whitespace and replace spaces with underscores
+    clean_filename = "_".join(file.name.strip().split())
 
-from .serializers import AggregationRequestSerializer, DatasetCreateSerializer, DatasetSourceSerializer
-from .tasks import process_dataset_file
+    # Save file temporarily in the upload directory, hashing it for deduplication
+    file_path, content_hash = save_upload(file, clean_filename)
+
+    # Stage the file in object storage so any worker host can process it
+    try:
+        staged_key = stage_upload(file_path, clean_filename)
+    except Exception:
+        os.remove(file_path)
+        raise
+    print(f"File staged at: {staged_key}")
+
+    # Create dataset with initial status
+    dataset = serializer.save(owner=User.objects.first(), status="READ_PENDING")
+
+    # Launch Celery task to process the file in the background
+    process_dataset_file.delay(None, clean_filename, str(dataset.object_id), content_hash, staged_key=staged_key)
+    return dataset
 
 
 # Create your views here.
@@ -32,15 +113,32 @@ from .tasks import process_dataset_file
 def upload_view(request):
     if request.method == "POST" and request.FILES.get("file"):
         file = request.FILES["file"]
-        # Trim whitespace and replace spaces with underscores
-        clean_filename = "_".join(file.name.strip().split())
-        file_path = f"/tmp/{clean_filename}"
-        # Save file temporarily
-        with open(file_path, "wb") as f:
-            for chunk in file.chunks():
-                f.write(chunk)
-        file_url = upload_dataset_to_s3(file_path, clean_filename)
-        return JsonResponse({"message": "File uploaded!", "url": file_url})
+        # Conversion runs in the Celery pipeline, so the request returns as soon as the file is staged
+        serializer = DatasetCreateSerializer(
+            data={
+                "name": request.POST.get("name") or os.path.splitext(file.name.strip())[0],
+                "description": request.POST.get("description", ""),
+                # Passed so the file type is validated before anything is staged
+                "file": file,
+            }
+        )
+        if not serializer.is_valid():
+            return JsonResponse({"error": serializer.errors}, status=400)
+
+        try:
+            dataset = queue_dataset_upload(serializer, file)
+        except Exception as e:
+            return JsonResponse({"error": f"Failed to initiate dataset processing: {str(e)}"}, status=500)
+
+        return JsonResponse(
+            {
+                "message": "File uploaded! Processing in background.",
+                "dataset_id": str(dataset.object_id),
+                "status": "READ_PENDING",
+                "status_url": f"/dashboard/api/datasets/{dataset.object_id}/",
+            },
+            status=202,
+        )
 
     # For GET requests, render the upload template
     return render(request, "dashboard/upload.html")
@@ -82,33 +180,7 @@ class CraeteDatsetView(APIView):
                 if not file:
                     return Response({"error": "No file was uploaded"}, status=status.HTTP_400_BAD_REQUEST)
 
-                # Trim whitespace and replace spaces with underscores
-                clean_filename = "_".join(file.name.strip().split())
-
-                # Create a media directory if it doesn't exist
-                import os
-
-                media_dir = os.path.join(
-                    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "media", "uploads"
-                )
-                os.makedirs(media_dir, exist_ok=True)
-
-                # Use the media directory for temporary file storage
-                file_path = os.path.join(media_dir, clean_filename)
-
-                # Save file temporarily
-                with open(file_path, "wb") as f:
-                    for chunk in file.chunks():
-                        f.write(chunk)
-
-                # Log the file path for debugging
-                print(f"File saved at: {file_path}")
-
-                # Create dataset with initial status
-                dataset = serializer.save(owner=User.objects.first(), status="READ_PENDING")
-
-                # Launch Celery task to process the file in the background
-                process_dataset_file.delay(file_path, clean_filename, str(dataset.object_id))
+                dataset = queue_dataset_upload(serializer, file)
 
                 # Return immediate response
                 return Response(
@@ -145,6 +217,316 @@ class CraeteDatsetView(APIView):
     #     return JsonResponse({"success": "Upload success fully"}, status=200)
 
 
+def direct_uploads_unavailable():
+    """
+    Get the error response for direct uploads when the storage backend cannot accept them.
+
+    Returns:
+        Response: A 400 response, or None if direct uploads are available
+    """
+    if get_storage_backend().name != "s3":
+        return Response(
+            {"error": "Direct uploads require the S3 storage backend"}, status=status.HTTP_400_BAD_REQUEST
+        )
+    return None
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class PresignedUploadView(APIView):
+    """
+    API view for starting an upload that the browser sends straight to S3/Minio.
+
+    POST: Start a multipart upload and get a presigned URL for each part.
+    """
+
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        """
+        Start a multipart upload and get a presigned URL for each part.
+        """
+        unavailable = direct_uploads_unavailable()
+        if unavailable is not None:
+            return unavailable
+
+        serializer = PresignedUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        size = serializer.validated_data["size"]
+        if size > settings.PRESIGNED_UPLOAD_MAX_BYTES:
+            return Response(
+                {"error": f"File is too large. Maximum size is {settings.PRESIGNED_UPLOAD_MAX_BYTES} bytes"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Trim whitespace and replace spaces with underscores
+        clean_filename = "_".join(os.path.basename(serializer.validated_data["filename"]).strip().split())
+        staging_key = get_staging_key(clean_filename)
+
+        try:
+            upload = create_presigned_multipart_upload(staging_key, size)
+        except Exception as e:
+            return Response(
+                {"error": f"Failed to start upload: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        return Response(upload, status=status.HTTP_201_CREATED)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class PresignedUploadCompleteView(APIView):
+    """
+    API view for completing a direct upload and processing the staged file.
+
+    POST: Complete the multipart upload, create the dataset and start processing it.
+    """
+
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        """
+        Complete the multipart upload, create the dataset and start processing it.
+        """
+        unavailable = direct_uploads_unavailable()
+        if unavailable is not None:
+            return unavailable
+
+        serializer = PresignedUploadCompleteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        staging_key = serializer.validated_data["key"]
+        try:
+            complete_presigned_multipart_upload(
+                staging_key, serializer.validated_data["upload_id"], serializer.validated_data["parts"]
+            )
+        except Exception as e:
+            return Response(
+                {"error": f"Failed to complete upload: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            # Create dataset with initial status
+            dataset = serializer.save(owner=User.objects.first(), status="READ_PENDING")
+
+            # The worker reads the staged object itself, so no file passes through this process
+            clean_filename = os.path.basename(staging_key)
+            process_dataset_file.delay(None, clean_filename, str(dataset.object_id), staged_key=staging_key)
+
+            return Response(
+                {
+                    "message": "Dataset creation initiated. Processing in background.",
+                    "dataset": serializer.data,
+                    "dataset_id": str(dataset.object_id),
+                    "status": "READ_PENDING",
+                    "note": "Metadata and aggregation possibilities will be available once processing is complete.",
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+        except Exception as e:
+            return Response(
+                {"error": f"Failed to initiate dataset processing: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class PresignedUploadAbortView(APIView):
+    """
+    API view for cancelling a direct upload.
+
+    POST: Abort the multipart upload and discard its parts.
+    """
+
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        """
+        Abort the multipart upload and discard its parts.
+        """
+        serializer = PresignedUploadAbortSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            abort_presigned_multipart_upload(serializer.validated_data["key"], serializer.validated_data["upload_id"])
+        except Exception as e:
+            return Response({"error": f"Failed to abort upload: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"message": "Upload aborted"}, status=status.HTTP_200_OK)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ResumableUploadView(APIView):
+    """
+    API view for starting a resumable upload, sent in chunks that can be retried independently.
+
+    POST: Start an upload session and get its chunk size and chunk count.
+    """
+
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        """
+        Start an upload session and get its chunk size and chunk count.
+        """
+        serializer = ResumableUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        size = serializer.validated_data["size"]
+        if size > settings.RESUMABLE_UPLOAD_MAX_BYTES:
+            return Response(
+                {"error": f"File is too large. Maximum size is {settings.RESUMABLE_UPLOAD_MAX_BYTES} bytes"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Trim whitespace and replace spaces with underscores
+        clean_filename = "_".join(os.path.basename(serializer.validated_data["filename"]).strip().split())
+
+        store = get_resumable_upload_store()
+        try:
+            # Sessions that were never finished would otherwise keep their disk space forever
+            store.cleanup_stale(settings.RESUMABLE_UPLOAD_EXPIRY_SECONDS)
+            upload = store.create(clean_filename, size)
+        except Exception as e:
+            return Response(
+                {"error": f"Failed to start upload: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        return Response(upload, status=status.HTTP_201_CREATED)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ResumableUploadDetailView(APIView):
+    """
+    API view for a resumable upload session.
+
+    GET/HEAD: Get the upload offset and which chunks have been received, to resume an upload.
+    DELETE: Cancel the upload and discard the received chunks.
+    """
+
+    permission_classes = [AllowAny]
+
+    def get(self, request, upload_id):
+        """
+        Get the upload offset and which chunks have been received, to resume an upload.
+        """
+        try:
+            upload = get_resumable_upload_store().status(upload_id)
+        except FileNotFoundError:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        response = Response(upload, status=status.HTTP_200_OK)
+        # Same headers as a tus offset query, for clients that only send HEAD requests
+        response["Upload-Offset"] = str(upload["offset"])
+        response["Upload-Length"] = str(upload["size"])
+        response["Cache-Control"] = "no-store"
+        return response
+
+    def delete(self, request, upload_id):
+        """
+        Cancel the upload and discard the received chunks.
+        """
+        try:
+            get_resumable_upload_store().abort(upload_id)
+        except FileNotFoundError:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ResumableUploadChunkView(APIView):
+    """
+    API view for the chunks of a resumable upload.
+
+    PUT: Store one chunk, sent as the raw request body. Chunks may be sent in any order
+    and retried; an Upload-Checksum header ("sha256 <base64 digest>") is verified if present.
+    """
+
+    permission_classes = [AllowAny]
+
+    def put(self, request, upload_id, index):
+        """
+        Store one chunk, sent as the raw request body.
+        """
+        # The body is read as a stream, so chunks are not limited by DATA_UPLOAD_MAX_MEMORY_SIZE
+        stream = request.stream or BytesIO()
+        try:
+            get_resumable_upload_store().write_chunk(
+                upload_id, index, stream, checksum=request.headers.get("Upload-Checksum")
+            )
+        except FileNotFoundError:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+        except ChecksumMismatchError as e:
+            # 460 is the tus status for a checksum mismatch; the client resends the chunk
+            return Response({"error": str(e)}, status=460)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ResumableUploadFinalizeView(APIView):
+    """
+    API view for finishing a resumable upload.
+
+    POST: Assemble the received chunks, create the dataset and start processing it.
+    """
+
+    permission_classes = [AllowAny]
+
+    def post(self, request, upload_id):
+        """
+        Assemble the received chunks, create the dataset and start processing it.
+        """
+        serializer = DatasetCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        store = get_resumable_upload_store()
+        try:
+            upload = store.status(upload_id)
+        except FileNotFoundError:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        if upload["missing_chunks"]:
+            return Response(
+                {"error": "Upload is incomplete", "missing_chunks": upload["missing_chunks"]},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        try:
+            file_path = store.finalize(upload_id, settings.UPLOAD_TEMP_DIR)
+
+            # Stage the assembled file in object storage so any worker host can process it
+            try:
+                staged_key = stage_upload(file_path, upload["filename"])
+            except Exception:
+                os.remove(file_path)
+                raise
+
+            # Create dataset with initial status
+            dataset = serializer.save(owner=User.objects.first(), status="READ_PENDING")
+
+            # The worker hashes the assembled file for deduplication
+            process_dataset_file.delay(None, upload["filename"], str(dataset.object_id), staged_key=staged_key)
+
+            return Response(
+                {
+                    "message": "Dataset creation initiated. Processing in background.",
+                    "dataset": serializer.data,
+                    "dataset_id": str(dataset.object_id),
+                    "status": "READ_PENDING",
+                    "note": "Metadata and aggregation possibilities will be available once processing is complete.",
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+        except Exception as e:
+            return Response(
+                {"error": f"Failed to initiate dataset processing: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
 class CreateDashboardView(APIView):
     def post(self, request):
         # Get the dashboard data from the request body
@@ -199,11 +581,8 @@ class GetDashboardView(APIView):
 
             print(f"Using file name from dataset {dataset.name}: {file_name}")
 
-            # Get the LazyFrame from S3
-            lazy_df = get_file_from_s3(file_name)
-
-            # Convert LazyFrame to DataFrame
-            df = lazy_df.collect()
+            # Get the decoded DataFrame (served from the in-process cache when possible)
+            df = get_dataset_frame(dataset, file_name)
 
             # Define the aggregations you want to perform
             aggregations = ["mean", "sum", "min", "max"]
@@ -296,8 +675,8 @@ class TestDashboardFuctions(APIView):
 
             print(f"Using file name from dataset {dataset.name}: {file_name}")
 
-            # Get the LazyFrame from S3
-            lf = get_file_from_s3(file_name)
+            # Get the LazyFrame from S3 (all partitions, for partitioned datasets)
+            lf = scan_dataset(dataset, file_name)
 
             # Print the LazyFrame (for debugging)
             print(lf)
@@ -319,7 +698,7 @@ class TestDashboardFuctions(APIView):
             # Prepare statistics expressions
             stats_exprs = []
             for name, dtype in lf_schema.items():
-                if dtype in (pl.Int64, pl.Int32, pl.Float64, pl.Float32):
+                if dtype.is_numeric():
                     stats_exprs.extend(
                         [
                             pl.col(name).mean().round(2).alias(f"{name}_mean"),
@@ -329,7 +708,7 @@ class TestDashboardFuctions(APIView):
                             pl.col(name).std().alias(f"{name}_std"),  # Bonus: standard deviation
                         ]
                     )
-                elif dtype == pl.Utf8:
+                elif is_string_dtype(dtype):
                     stats_exprs.extend(
                         [
                             pl.col(name).n_unique().alias(f"{name}_unique_count"),
@@ -411,12 +790,13 @@ class DataAggregationView(APIView):
                 else:
                     # Fallback to a default name
                     file_name = f"{dataset.name.replace(' ', '_')}.parquet"
+                # Get the decoded DataFrame (served from the in-process cache when possible)
+                lazy_df = get_dataset_frame(dataset, file_name).lazy()
             else:
                 # Get dataset by file name
                 file_name = validated_data["file_name"]
-
-            # Get the LazyFrame
-            lazy_df = get_file_from_s3(file_name)
+                # Get the LazyFrame
+                lazy_df = get_file_from_s3(file_name)
 
             # Convert to DataFrame for aggregations
             # The perform_aggregations function already handles this conversion,
@@ -465,12 +845,13 @@ class DatasetColumnAggregationsView(APIView):
                 else:
                     # Fallback to a default name
                     file_name = f"{dataset.name.replace(' ', '_')}.parquet"
+                # Get the decoded DataFrame (served from the in-process cache when possible)
+                lazy_df = get_dataset_frame(dataset, file_name).lazy()
             else:
                 # Get dataset by file name
                 file_name = validated_data["file_name"]
-
-            # Get the LazyFrame
-            lazy_df = get_file_from_s3(file_name)
+                # Get the LazyFrame
+                lazy_df = get_file_from_s3(file_name)
 
             # Convert to DataFrame for aggregations
             # The get_dataset_column_aggregations function already handles this conversion,
@@ -481,7 +862,7 @@ class DatasetColumnAggregationsView(APIView):
 
             # Get basic info about the dataset
             # We need to collect the LazyFrame to get this information
-            df_info = lazy_df.select(pl.count()).collect()
+            df_info = lazy_df.select(pl.len()).collect()
             num_rows = df_info[0, 0]
             num_columns = len(lazy_df.columns)
 
@@ -604,6 +985,29 @@ class DatasetStatusView(APIView):
             )
 
 
+class CacheStatsView(APIView):
+    """
+    API view for inspecting the dataset caches of the current worker process.
+
+    GET: Get hit/miss counters and sizes of the caches.
+    """
+
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """
+        Get hit/miss counters and sizes of the caches.
+        """
+        return Response(
+            {
+                "parquet_disk_cache": get_parquet_cache_stats(),
+                "arrow_hot_tier": get_hot_tier_stats(),
+                "dataframe_cache": get_frame_cache_stats(),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class DatasetVisualizationView(APIView):
     """
     API view for generating visualizations from datasets.
@@ -654,50 +1058,76 @@ class DatasetVisualizationView(APIView):
             print(f"Dataset metadata: {dataset.metadata}")
 
             try:
+                # Extract visualization parameters
+                x_axis = request_data["x_axis"]
+                y_axis = request_data["y_axis"]
+                chart_type = request_data.get("chart_type", "bar")
+
+                # Handle filter
+                filter_column = request_data.get("filter_column", None)
+                filter_value = request_data.get("filter_value", None)
+
+                # Handle time range, e.g. {"start": "2024-01-01", "end": "2024-03-31"}
+                time_range = request_data.get("time_range") or {}
+                time_start = time_range.get("start")
+                time_end = time_range.get("end")
+                time_column = None
+                if time_start or time_end:
+                    time_column = time_range.get("column") or dataset.metadata.get("file_info", {}).get(
+                        "partition_column"
+                    )
+                    if not time_column:
+                        schema = dataset.metadata.get("schema", {})
+                        time_column = next(
+                            (col for col, dtype in schema.items() if dtype.startswith(("Date", "Datetime"))), None
+                        )
+                    if not time_column:
+                        raise ValueError("time_range requires a 'column' since the dataset has no date column")
+
+                # Only the axis, filter and time range columns need to be read from the dataset
+                x_columns = x_axis if isinstance(x_axis, list) else [x_axis]
+                y_columns = y_axis if isinstance(y_axis, list) else [y_axis]
+                needed_columns = list(
+                    dict.fromkeys(
+                        x_columns
+                        + y_columns
+                        + ([filter_column] if filter_column else [])
+                        + ([time_column] if time_column else [])
+                    )
+                )
+
                 # Get the LazyFrame from S3
                 print(f"Attempting to retrieve file from S3: {file_name}")
                 try:
-                    lazy_df = get_file_from_s3(file_name)
+                    # Served from the in-process cache or, for large datasets, a column-projected remote scan
+                    # of only the partitions that overlap the time range
+                    lf = scan_dataset(dataset, file_name, start=time_start, end=time_end)
+                    available_columns = lf.collect_schema().names()
                     print(f"Successfully retrieved file from S3: {file_name}")
-
-                    # Convert to DataFrame for processing
-                    print("Converting LazyFrame to DataFrame...")
-                    df = lazy_df.collect()
-                    print(f"DataFrame shape: {df.shape}")
-                    print(f"DataFrame columns: {df.columns}")
-                    print(f"DataFrame first few rows: {df.head(3)}")
                 except Exception as e:
                     print(f"Error retrieving or processing file from S3: {str(e)}")
                     raise
 
-                # Extract visualization parameters
-                x_axis = request_data["x_axis"]
-                y_axis = request_data["y_axis"]
-                chart_type = request_data.get("chart_type", "bar")
-
-                # Validate that the columns exist in the DataFrame
+                # Validate that the columns exist in the dataset
                 print(f"Validating columns: x_axis={x_axis}, y_axis={y_axis}")
-                print(f"Available columns in DataFrame: {df.columns}")
-
-                # Check if x_axis exists in the DataFrame
-                if isinstance(x_axis, list):
-                    for col in x_axis:
-                        if col not in df.columns:
-                            raise ValueError(
-                                f"X-axis column '{col}' not found in dataset. Available columns: {df.columns}"
-                            )
-                elif x_axis not in df.columns:
-                    raise ValueError(f"X-axis column '{x_axis}' not found in dataset. Available columns: {df.columns}")
-
-                # Check if y_axis exists in the DataFrame
-                if isinstance(y_axis, list):
-                    for col in y_axis:
-                        if col not in df.columns:
-                            raise ValueError(
-                                f"Y-axis column '{col}' not found in dataset. Available columns: {df.columns}"
-                            )
-                elif y_axis not in df.columns:
-                    raise ValueError(f"Y-axis column '{y_axis}' not found in dataset. Available columns: {df.columns}")
+                print(f"Available columns in dataset: {available_columns}")
+
+                # Check if x_axis exists in the dataset
+                for col in x_columns:
+                    if col not in available_columns:
+                        raise ValueError(
+                            f"X-axis column '{col}' not found in dataset. Available columns: {available_columns}"
+                        )
+
+                # Check if y_axis exists in the dataset
+                for col in y_columns:
+                    if col not in available_columns:
+                        raise ValueError(
+                            f"Y-axis column '{col}' not found in dataset. Available columns: {available_columns}"
+                        )
+
+                # Project early so only the needed column chunks are fetched
+                lf = lf.select([col for col in needed_columns if col in available_columns])
 
                 # Handle x-axis aggregations
                 x_axis_aggregations = request_data.get("x_axis_aggregations", {})
@@ -706,13 +1136,26 @@ class DatasetVisualizationView(APIView):
                 y_axis_aggregations = request_data.get("y_axis_aggregations", {})
                 print(f"Y-axis aggregations: {y_axis_aggregations}")
 
-                # Handle filter
-                filter_column = request_data.get("filter_column", None)
-                filter_value = request_data.get("filter_value", None)
+                # Chart only the top N x-axis values by the first y-axis measure, grouping the rest as "Other"
+                top_n = request_data.get("top_n")
+                if top_n is not None:
+                    top_n = int(top_n)
+                    if top_n < 1:
+                        raise ValueError("top_n must be a positive integer")
 
-                # Apply filter if provided
+                # Apply filter if provided (pushed down to the Parquet reader for remote scans)
                 if filter_column and filter_value:
-                    df = df.filter(pl.col(filter_column) == filter_value)
+                    lf = lf.filter(pl.col(filter_column) == filter_value)
+
+                # Apply the time range (row groups outside it are skipped using their statistics)
+                if time_column:
+                    if time_column not in available_columns:
+                        raise ValueError(f"Time range column '{time_column}' not found in dataset")
+                    time_filter = time_range_expression(
+                        time_column, lf.collect_schema()[time_column], time_start, time_end
+                    )
+                    if time_filter is not None:
+                        lf = lf.filter(time_filter)
 
                 # Process the data based on the chart type and aggregations
                 # Handle the case where x_axis is a list (should be a single value now)
@@ -722,11 +1165,12 @@ class DatasetVisualizationView(APIView):
                 # Use the centralized function to perform aggregations
                 print(f"Calling perform_axis_based_aggregation with x_axis={x_axis}, y_axis={y_axis}")
                 aggregation_result = perform_axis_based_aggregation(
-                    df=df,
+                    df=lf,
                     x_axis=x_axis,
                     y_axis=y_axis,
                     x_axis_aggregations=x_axis_aggregations,
                     y_axis_aggregations=y_axis_aggregations,
+                    top_n=top_n,
                 )
 
                 # Extract the chart data and metadata
@@ -737,10 +1181,14 @@ class DatasetVisualizationView(APIView):
                 print(f"Chart labels: {chart_data['labels']}")
                 print(f"Chart datasets: {[d['label'] for d in chart_data['datasets']]}")
 
-                # Create summary information
+                # Create summary information; the row count comes from the aggregation pass
+                num_rows = metadata["num_rows"]
                 summary = {
-                    "total_rows": len(df),
-                    "filtered_rows": len(df) if not filter_column else None,
+                    "total_rows": num_rows,
+                    "filtered_rows": num_rows if not filter_column else None,
+                    "time_range": (
+                        {"column": time_column, "start": time_start, "end": time_end} if time_column else None
+                    ),
                     "aggregation_info": f"Aggregation performed using centralized function",
                     "metadata": metadata,
                 }
@@ -4,10 +4,13 @@ Script to create the Minio bucket if it doesn't exist.
 This should be run when the container starts.
 """
 import os
+import sys
 import time
 
-import boto3
-from botocore.client import Config
+# Make the project importable when run as /app/scripts/create_minio_bucket.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.s3_client import build_s3_client  # noqa: E402
 
 # Wait for Minio to be ready
 time.sleep(5)
@@ -19,9 +22,7 @@ AWS_BUCKET = os.getenv("S3_BUCKET", "userdashboard")
 AWS_ENDPOINT = os.getenv("S3_ENDPOINT", "http://minio:9000")
 
 # Create S3 client
-session = boto3.Session(aws_access_key_id=AWS_ACCESS_KEY_ID, aws_secret_access_key=AWS_SECRET_ACCESS_KEY)
-config = Config(signature_version="s3v4", retries={"total_max_attempts": 3, "mode": "standard"}, read_timeout=200)
-s3 = session.client("s3", endpoint_url=AWS_ENDPOINT, config=config)
+s3 = build_s3_client(AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_ENDPOINT)
 
 # Create bucket if it doesn't exist
 try:
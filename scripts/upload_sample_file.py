@@ -7,11 +7,14 @@ import os
 import sys
 from io import BytesIO
 
-import boto3
 import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
-from botocore.client import Config
+
+# Make the project importable when run as /app/scripts/upload_sample_file.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.s3_client import build_s3_client, build_transfer_config  # noqa: E402
 
 # Get settings from environment variables
 AWS_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY", "minioadmin")
@@ -46,9 +49,7 @@ def upload_sample_file():
     parquet_buffer.seek(0)
 
     # Create S3 client
-    session = boto3.Session(aws_access_key_id=AWS_ACCESS_KEY_ID, aws_secret_access_key=AWS_SECRET_ACCESS_KEY)
-    config = Config(signature_version="s3v4", retries={"total_max_attempts": 3, "mode": "standard"}, read_timeout=200)
-    s3 = session.client("s3", endpoint_url=AWS_ENDPOINT, config=config)
+    s3 = build_s3_client(AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_ENDPOINT)
 
     # Create bucket if it doesn't exist
     try:
@@ -68,7 +69,7 @@ def upload_sample_file():
 
     # Upload file
     try:
-        s3.upload_fileobj(parquet_buffer, AWS_BUCKET, s3_path)
+        s3.upload_fileobj(parquet_buffer, AWS_BUCKET, s3_path, Config=build_transfer_config())
         print(f"Uploaded sample file to {s3_path}")
         return True
     except Exception as e:
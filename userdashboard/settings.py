@@ -181,6 +181,17 @@ AWS_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY")
 AWS_SECRET_ACCESS_KEY = os.getenv("S3_SECRET_KEY")
 AWS_BUCKET = os.getenv("S3_BUCKET")
 AWS_ENDPOINT = os.getenv("S3_ENDPOINT")
+AWS_REGION = os.getenv("S3_REGION", "us-east-1")
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32"))
+S3_MULTIPART_THRESHOLD = int(os.getenv("S3_MULTIPART_THRESHOLD", str(8 * 1024 * 1024)))
+S3_MULTIPART_CHUNKSIZE = int(os.getenv("S3_MULTIPART_CHUNKSIZE", str(8 * 1024 * 1024)))
+S3_MAX_CONCURRENCY = int(os.getenv("S3_MAX_CONCURRENCY", "10"))
+S3_PART_MAX_RETRIES = int(os.getenv("S3_PART_MAX_RETRIES", "3"))
+# Address of S3/Minio as seen by browsers, for presigned upload URLs (defaults to S3_ENDPOINT)
+S3_PUBLIC_ENDPOINT = os.getenv("S3_PUBLIC_ENDPOINT", AWS_ENDPOINT)
+PRESIGNED_UPLOAD_PART_SIZE = int(os.getenv("PRESIGNED_UPLOAD_PART_SIZE", str(16 * 1024 * 1024)))
+PRESIGNED_UPLOAD_MAX_BYTES = int(os.getenv("PRESIGNED_UPLOAD_MAX_BYTES", str(20 * 1024 * 1024 * 1024)))
+PRESIGNED_URL_EXPIRES_SECONDS = int(os.getenv("PRESIGNED_URL_EXPIRES_SECONDS", "3600"))
 AWS_S3_OBJECT_PARAMETERS = {
     "CacheControl": "max-age=86400",
 }
@@ -188,6 +199,54 @@ DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
 AWS_S3_SECURE_URLS = False
 AWS_S3_VERIFY = False
 
+# Where converted datasets are stored: "s3" (S3/Minio), "b2" (Backblaze B2) or "local"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "s3")
+# Root directory of the local storage backend
+LOCAL_STORAGE_ROOT = os.getenv("LOCAL_STORAGE_ROOT", os.path.join(BASE_DIR, "media", "storage"))
+# Where uploaded files are kept until they are processed
+UPLOAD_TEMP_DIR = os.getenv("UPLOAD_TEMP_DIR", os.path.join(MEDIA_ROOT, "uploads"))
+# Resumable chunked uploads; unfinished sessions are removed after the expiry
+RESUMABLE_UPLOAD_CHUNK_SIZE = int(os.getenv("RESUMABLE_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+RESUMABLE_UPLOAD_MAX_BYTES = int(os.getenv("RESUMABLE_UPLOAD_MAX_BYTES", str(20 * 1024 * 1024 * 1024)))
+RESUMABLE_UPLOAD_EXPIRY_SECONDS = int(os.getenv("RESUMABLE_UPLOAD_EXPIRY_SECONDS", str(24 * 60 * 60)))
+
+# Local on-disk cache for Parquet files downloaded from S3/Minio (set max bytes to 0 to disable)
+PARQUET_CACHE_DIR = os.getenv("PARQUET_CACHE_DIR", os.path.join(BASE_DIR, "tmp", "parquet_cache"))
+PARQUET_CACHE_MAX_BYTES = int(os.getenv("PARQUET_CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+# Local hot tier of frequently used datasets as memory-mapped Arrow IPC files (set max bytes to 0 to disable)
+ARROW_HOT_TIER_DIR = os.getenv("ARROW_HOT_TIER_DIR", os.path.join(BASE_DIR, "tmp", "arrow_hot_tier"))
+ARROW_HOT_TIER_MAX_BYTES = int(os.getenv("ARROW_HOT_TIER_MAX_BYTES", str(4 * 1024 * 1024 * 1024)))
+# Number of loads by a worker after which a dataset is promoted to the hot tier
+ARROW_HOT_TIER_PROMOTE_AFTER = int(os.getenv("ARROW_HOT_TIER_PROMOTE_AFTER", "3"))
+
+# In-process cache of decoded DataFrames, per worker process (set max bytes to 0 to disable)
+DATAFRAME_CACHE_MAX_BYTES = int(os.getenv("DATAFRAME_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# CSV uploads at least this large are converted with the streaming engine instead of in memory
+STREAMING_INGEST_MIN_BYTES = int(os.getenv("STREAMING_INGEST_MIN_BYTES", str(256 * 1024 * 1024)))
+
+# String columns with at most this many distinct values are stored as Categorical (0 to disable)
+CATEGORICAL_MAX_UNIQUE = int(os.getenv("CATEGORICAL_MAX_UNIQUE", "256"))
+
+# Excel reader: "calamine" (needs fastexcel, falls back to openpyxl if missing) or "openpyxl"
+EXCEL_ENGINE = os.getenv("EXCEL_ENGINE", "calamine")
+# .xlsx uploads at least this large are read row by row with bounded memory
+EXCEL_STREAMING_MIN_BYTES = int(os.getenv("EXCEL_STREAMING_MIN_BYTES", str(64 * 1024 * 1024)))
+# Number of extra workbook sheets converted at the same time
+EXCEL_SHEET_WORKERS = int(os.getenv("EXCEL_SHEET_WORKERS", "2"))
+
+# Datasets whose estimated in-memory size exceeds this are read with column-projected ranged GETs
+S3_RANGE_READ_MIN_BYTES = int(os.getenv("S3_RANGE_READ_MIN_BYTES", str(256 * 1024 * 1024)))
+
+# Parquet files are written with row groups of roughly this many uncompressed bytes
+PARQUET_ROW_GROUP_TARGET_BYTES = int(os.getenv("PARQUET_ROW_GROUP_TARGET_BYTES", str(64 * 1024 * 1024)))
+# Sort rows by the first date column at ingest so row-group statistics can prune time filters
+PARQUET_CLUSTER_BY_DATE = os.getenv("PARQUET_CLUSTER_BY_DATE", "True").lower() in ("true", "1", "t")
+
+# Uploads at least this large with a date column are stored partitioned by year/month (0 to disable)
+PARTITIONED_STORAGE_MIN_BYTES = int(os.getenv("PARTITIONED_STORAGE_MIN_BYTES", str(1024 * 1024 * 1024)))
+
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
@@ -1,9 +1,13 @@
 import json
+import math
 from typing import Any, Dict, List, Optional, Union
 
 import polars as pl
 
-# Define available aggregation functions for different data types
+from utils.column_encoding import is_string_dtype
+
+# Define available aggregation functions for different data types; each maps a column
+# expression to a single-value aggregation expression
 NUMERIC_AGGREGATIONS = {
     "mean": lambda col: col.mean(),
     "sum": lambda col: col.sum(),
@@ -23,12 +27,12 @@ NUMERIC_AGGREGATIONS = {
 
 STRING_AGGREGATIONS = {
     "unique_count": lambda col: col.n_unique(),
-    "most_frequent": lambda col: col.mode().get(0, None),
+    "most_frequent": lambda col: col.mode().first(),
     "min_value": lambda col: col.min(),
     "max_value": lambda col: col.max(),
-    "mean_length": lambda col: col.str.lengths().mean(),
+    "mean_length": lambda col: col.str.len_chars().mean(),
     "null_count": lambda col: col.is_null().sum(),
-    "empty_count": lambda col: (col.str.lengths() == 0).sum(),
+    "empty_count": lambda col: (col.str.len_chars() == 0).sum(),
     "is_unique": lambda col: col.n_unique() == col.len(),
 }
 
@@ -40,7 +44,7 @@ DATETIME_AGGREGATIONS = {
     "unique_days": lambda col: col.dt.day().n_unique(),
     "unique_months": lambda col: col.dt.month().n_unique(),
     "unique_years": lambda col: col.dt.year().n_unique(),
-    "most_frequent": lambda col: col.mode().get(0, None),
+    "most_frequent": lambda col: col.mode().first(),
     "null_count": lambda col: col.is_null().sum(),
     "non_null_count": lambda col: col.count(),
     # Time-based aggregations
@@ -77,7 +81,7 @@ def get_column_type(df: pl.DataFrame, column: str) -> str:
         pl.Float64,
     ):
         return "numeric"
-    elif dtype == pl.Utf8:
+    elif is_string_dtype(dtype):
         return "string"
     elif dtype in (pl.Date, pl.Datetime, pl.Time):
         return "datetime"
@@ -85,78 +89,100 @@ def get_column_type(df: pl.DataFrame, column: str) -> str:
         return "unknown"
 
 
-def perform_aggregations(df: pl.DataFrame, aggregation_config: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+def perform_aggregations(
+    df: Union[pl.DataFrame, pl.LazyFrame], aggregation_config: Dict[str, List[str]]
+) -> Dict[str, Dict[str, Any]]:
     """
     Perform multiple aggregations on specified columns of a DataFrame.
 
+    All aggregations are compiled into named expressions and computed in a single
+    parallel select, so the data is scanned once and only the requested columns are
+    read. An aggregation that fails is reported as an error without affecting the others.
+
     Args:
-        df (pl.DataFrame): The DataFrame to aggregate
+        df (Union[pl.DataFrame, pl.LazyFrame]): The DataFrame or LazyFrame to aggregate
         aggregation_config (Dict[str, List[str]]): A dictionary mapping column names to lists of aggregation functions
             Example: {'column1': ['mean', 'sum'], 'column2': ['unique_count']}
 
     Returns:
         Dict[str, Dict[str, Any]]: A dictionary with column names as keys and dictionaries of aggregation results as values
     """
-    # Ensure we're working with a DataFrame, not a LazyFrame
-    if isinstance(df, pl.LazyFrame):
-        df = df.collect()
+    # Convert to LazyFrame so the aggregations run as one query
+    lf = df.lazy() if isinstance(df, pl.DataFrame) else df
+    schema = lf.collect_schema()
 
     results = {}
+    # Named expressions computed in the single pass, keyed by their output name
+    expressions = {}
+    targets = {}
 
     for column, aggregations in aggregation_config.items():
         # Skip if column doesn't exist
-        if column not in df.columns:
+        if column not in schema:
             continue
 
-        column_type = get_column_type(df, column)
+        column_type = get_column_type_from_schema(schema, column)
         results[column] = {}
 
-        # Apply appropriate aggregations based on column type
         if column_type == "numeric":
-            for agg in aggregations:
-                if agg in NUMERIC_AGGREGATIONS:
-                    try:
-                        result = NUMERIC_AGGREGATIONS[agg](df[column])
-                        # Convert to Python native type for JSON serialization
-                        if hasattr(result, "item"):
-                            result = result.item()
-                        results[column][agg] = result
-                    except Exception as e:
-                        results[column][agg] = f"Error: {str(e)}"
-
+            aggregation_table = NUMERIC_AGGREGATIONS
+            col = pl.col(column)
         elif column_type == "string":
-            for agg in aggregations:
-                if agg in STRING_AGGREGATIONS:
-                    try:
-                        result = STRING_AGGREGATIONS[agg](df[column])
-                        # Convert to Python native type for JSON serialization
-                        if hasattr(result, "item"):
-                            result = result.item()
-                        results[column][agg] = result
-                    except Exception as e:
-                        results[column][agg] = f"Error: {str(e)}"
-
+            aggregation_table = STRING_AGGREGATIONS
+            # Categorical columns are compared and measured as plain strings
+            col = pl.col(column).cast(pl.Utf8)
         elif column_type == "datetime":
-            for agg in aggregations:
-                if agg in DATETIME_AGGREGATIONS:
-                    try:
-                        # Handle special time-based aggregations
-                        if agg in ["daily", "monthly", "quarterly", "yearly"]:
-                            # Perform time-based aggregation
-                            time_agg_result = perform_time_based_aggregation(df, column, agg)
-                            results[column][agg] = time_agg_result
-                        else:
-                            # Handle regular datetime aggregations
-                            result = DATETIME_AGGREGATIONS[agg](df[column])
-                            # Convert to Python native type for JSON serialization
-                            if hasattr(result, "item"):
-                                result = result.item()
-                            # Convert datetime objects to ISO format strings
-                            if hasattr(result, "isoformat"):
-                                result = result.isoformat()
-                            results[column][agg] = result
-                    except Exception as e:
-                        results[column][agg] = f"Error: {str(e)}"
+            aggregation_table = DATETIME_AGGREGATIONS
+            col = pl.col(column)
+        else:
+            continue
+
+        for agg in aggregations:
+            if agg not in aggregation_table:
+                continue
+
+            # Time-based aggregations group the data, so they run as queries of their own
+            if column_type == "datetime" and agg in ["daily", "monthly", "quarterly", "yearly"]:
+                try:
+                    results[column][agg] = perform_time_based_aggregation(lf, column, agg)
+                except Exception as e:
+                    results[column][agg] = f"Error: {str(e)}"
+                continue
+
+            name = f"{len(expressions)}:{column}:{agg}"
+            # Reserve the result's place, so results keep the requested order
+            results[column][agg] = None
+            try:
+                expression = aggregation_table[agg](col).alias(name)
+                # Resolve the output type now, so invalid aggregations fail before any data is read
+                lf.select(expression).collect_schema()
+            except Exception as e:
+                results[column][agg] = f"Error: {str(e)}"
+                continue
+            expressions[name] = expression
+            targets[name] = (column, agg)
+
+    if not expressions:
+        return results
+
+    try:
+        values = lf.select(list(expressions.values())).collect().row(0, named=True)
+    except Exception:
+        # Run the aggregations one by one, so a failure only affects the aggregation that caused it
+        values = {}
+        for name, expression in expressions.items():
+            try:
+                values[name] = lf.select(expression).collect().item()
+            except Exception as e:
+                column, agg = targets[name]
+                results[column][agg] = f"Error: {str(e)}"
+
+    for name, value in values.items():
+        column, agg = targets[name]
+        # Convert datetime objects to ISO format strings for JSON serialization
+        if hasattr(value, "isoformat"):
+            value = value.isoformat()
+        results[column][agg] = value
 
     return results
 
@@ -209,7 +235,7 @@ def perform_time_based_aggregation(
 
         # Create a query that adds the time period column, groups by it, and counts
         agg_query = (
-            lf.with_columns(time_period_expr).group_by("time_period").agg(pl.count().alias("count")).sort("time_period")
+            lf.with_columns(time_period_expr).group_by("time_period").agg(pl.len().alias("count")).sort("time_period")
         )
 
         # Execute the query
@@ -475,14 +501,18 @@ def extract_dataset_metadata(df: Union[pl.DataFrame, pl.LazyFrame], sample_size:
     num_columns = len(columns)
 
     # Get row count using lazy evaluation
-    num_rows_query = lf.select(pl.count())
+    num_rows_query = lf.select(pl.len())
     num_rows = num_rows_query.collect().item()
 
     # For large datasets, use sampling for metadata generation
     sampling_applied = False
     if num_rows > sample_size:
         print(f"Large dataset detected ({num_rows} rows). Using sampling for metadata generation.")
-        sampled_df = lf.sample(sample_size, seed=42).collect()
+        if isinstance(df, pl.DataFrame):
+            sampled_df = df.sample(sample_size, seed=42)
+        else:
+            # LazyFrames cannot be randomly sampled; take evenly spaced rows in one streaming pass
+            sampled_df = lf.gather_every(num_rows // sample_size).head(sample_size).collect()
         sampling_applied = True
     else:
         sampled_df = lf.collect()
@@ -518,27 +548,7 @@ def extract_dataset_metadata(df: Union[pl.DataFrame, pl.LazyFrame], sample_size:
 
     # Estimate memory usage
     # For LazyFrames, we can't directly get the memory usage, so we estimate based on schema
-    estimated_memory = 0
-    for col, dtype in schema.items():
-        # Rough estimates based on data type
-        if dtype in (pl.Int8, pl.UInt8, pl.Boolean):
-            bytes_per_value = 1
-        elif dtype in (pl.Int16, pl.UInt16):
-            bytes_per_value = 2
-        elif dtype in (pl.Int32, pl.UInt32, pl.Float32):
-            bytes_per_value = 4
-        elif dtype in (pl.Int64, pl.UInt64, pl.Float64, pl.Date, pl.Time):
-            bytes_per_value = 8
-        elif dtype == pl.Datetime:
-            bytes_per_value = 8
-        elif dtype == pl.Utf8:
-            # For strings, we use an average estimate
-            bytes_per_value = 32
-        else:
-            bytes_per_value = 8  # Default estimate
-
-        # Add to total estimate
-        estimated_memory += num_rows * bytes_per_value
+    estimated_memory = num_rows * estimate_row_bytes(schema)
 
     # Add performance metrics
     end_time = time.time()
@@ -563,6 +573,49 @@ def extract_dataset_metadata(df: Union[pl.DataFrame, pl.LazyFrame], sample_size:
     return metadata
 
 
+def estimate_bytes_per_value(dtype: pl.DataType) -> int:
+    """
+    Roughly estimate the in-memory size of a single value of a data type.
+
+    Args:
+        dtype (pl.DataType): The Polars data type
+
+    Returns:
+        int: Estimated bytes per value
+    """
+    if dtype in (pl.Int8, pl.UInt8, pl.Boolean):
+        return 1
+    elif dtype in (pl.Int16, pl.UInt16):
+        return 2
+    elif dtype in (pl.Int32, pl.UInt32, pl.Float32):
+        return 4
+    elif dtype in (pl.Int64, pl.UInt64, pl.Float64, pl.Date, pl.Time):
+        return 8
+    elif dtype == pl.Datetime:
+        return 8
+    elif dtype in (pl.Categorical, pl.Enum):
+        # Dictionary-encoded strings hold a 32-bit code per value
+        return 4
+    elif dtype == pl.Utf8:
+        # For strings, we use an average estimate
+        return 32
+    else:
+        return 8  # Default estimate
+
+
+def estimate_row_bytes(schema: Dict[str, pl.DataType]) -> int:
+    """
+    Roughly estimate the in-memory size of a single row of a schema.
+
+    Args:
+        schema (Dict[str, pl.DataType]): The schema of the DataFrame
+
+    Returns:
+        int: Estimated bytes per row
+    """
+    return sum(estimate_bytes_per_value(dtype) for dtype in schema.values())
+
+
 def get_column_type_from_schema(schema: Dict[str, pl.DataType], column: str) -> str:
     """
     Determine the type of a column from a schema without loading the data.
@@ -590,7 +643,7 @@ def get_column_type_from_schema(schema: Dict[str, pl.DataType], column: str) ->
             pl.Float64,
         ):
             return "numeric"
-        elif dtype == pl.Utf8:
+        elif is_string_dtype(dtype):
             return "string"
         elif dtype in (pl.Date, pl.Datetime, pl.Time):
             return "datetime"
@@ -634,6 +687,154 @@ def create_time_period_expression(x_axis: str, agg_type: str) -> pl.Expr:
         return pl.col(x_axis).dt.date().cast(pl.Utf8).alias("time_period")
 
 
+# Kinds of numeric x-axis bins: fixed width, fixed count, equal-frequency quantiles, and a
+# Freedman-Diaconis width chosen from the data
+BIN_TYPES = ["width", "count", "quantile", "auto"]
+
+# Named bin specifications that can be given as x-axis aggregations
+BIN_PRESETS = {
+    "bins": {"type": "auto"},
+    "bins_10": {"type": "count", "count": 10},
+    "quartiles": {"type": "quantile", "count": 4},
+    "deciles": {"type": "quantile", "count": 10},
+}
+
+
+def parse_bin_spec(aggregation: Any) -> Optional[Dict[str, Any]]:
+    """
+    Parse an x-axis aggregation as a numeric bin specification.
+
+    Args:
+        aggregation (Any): An x-axis aggregation: a preset name from BIN_PRESETS, or a dict such as
+            {"type": "width", "width": 5}, {"type": "count", "count": 10}, {"type": "quantile", "count": 4}
+            or {"type": "auto"}
+
+    Returns:
+        Optional[Dict[str, Any]]: The bin specification, or None if the aggregation is not one
+
+    Raises:
+        ValueError: If the specification is invalid
+    """
+    if isinstance(aggregation, str):
+        return BIN_PRESETS.get(aggregation)
+    if not isinstance(aggregation, dict):
+        return None
+
+    bin_type = aggregation.get("type")
+    if bin_type not in BIN_TYPES:
+        raise ValueError(f"Unsupported bin type: {bin_type}. Supported: {', '.join(BIN_TYPES)}")
+    if bin_type == "width" and not (isinstance(aggregation.get("width"), (int, float)) and aggregation["width"] > 0):
+        raise ValueError("Width bins need a positive 'width'")
+    if bin_type in ["count", "quantile"] and not (
+        isinstance(aggregation.get("count"), int) and aggregation["count"] > 0
+    ):
+        raise ValueError(f"{bin_type.capitalize()} bins need a positive integer 'count'")
+    return aggregation
+
+
+def compute_bin_edges(lf: pl.LazyFrame, column: str, spec: Dict[str, Any], max_bins: int = 1000) -> List[float]:
+    """
+    Compute the edges of the bins of a numeric column.
+
+    The statistics the edges depend on (min, max, and quartiles or quantiles) are computed
+    in a single pass that returns one row.
+
+    Args:
+        lf (pl.LazyFrame): The data
+        column (str): The numeric column to bin
+        spec (Dict[str, Any]): The bin specification from parse_bin_spec
+        max_bins (int, optional): Maximum number of bins
+
+    Returns:
+        List[float]: The ascending bin edges, from the column's min to its max; empty if the
+            column has no values
+
+    Raises:
+        ValueError: If the specification needs more than max_bins bins
+    """
+    col = pl.col(column).cast(pl.Float64)
+    stats_exprs = [col.min().alias("min"), col.max().alias("max"), col.count().alias("count")]
+    if spec["type"] == "auto":
+        stats_exprs.extend([col.quantile(0.25).alias("q25"), col.quantile(0.75).alias("q75")])
+    elif spec["type"] == "quantile":
+        stats_exprs.extend(
+            col.quantile(i / spec["count"], interpolation="linear").alias(f"q{i}") for i in range(1, spec["count"])
+        )
+    stats = lf.select(stats_exprs).collect().row(0, named=True)
+
+    low, high = stats["min"], stats["max"]
+    if low is None:
+        return []
+    if low == high:
+        return [low, high]
+
+    if spec["type"] == "quantile":
+        # Repeated quantiles of skewed data would make empty bins, so they are merged
+        inner = sorted({stats[f"q{i}"] for i in range(1, spec["count"])} - {low, high})
+        return [low] + inner + [high]
+
+    if spec["type"] == "width":
+        width = spec["width"]
+        num_bins = math.ceil((high - low) / width)
+    elif spec["type"] == "count":
+        num_bins = spec["count"]
+        width = (high - low) / num_bins
+    else:
+        # Freedman-Diaconis: a width of 2 * IQR / n^(1/3), or Sturges' rule when the IQR is 0
+        iqr = stats["q75"] - stats["q25"]
+        if iqr > 0:
+            num_bins = math.ceil((high - low) / (2 * iqr / stats["count"] ** (1 / 3)))
+        else:
+            num_bins = math.ceil(math.log2(stats["count"])) + 1
+        num_bins = min(num_bins, max_bins)
+        width = (high - low) / num_bins
+
+    if num_bins > max_bins:
+        raise ValueError(f"Binning '{column}' would make {num_bins} bins, more than the maximum of {max_bins}")
+    return [low + i * width for i in range(num_bins)] + [high]
+
+
+def _format_bin_edge(value: float, precision: int = 6) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return f"{value:.{precision}g}"
+
+
+def _format_bin_labels(edges: List[float]) -> List[str]:
+    # Edges closer together than the display precision would print alike, so add digits until they differ
+    for precision in range(6, 18):
+        formatted = [_format_bin_edge(edge, precision) for edge in edges]
+        if len(set(formatted)) == len(formatted):
+            break
+    return [
+        f"[{low}, {high}{']' if i == len(edges) - 2 else ')'}"
+        for i, (low, high) in enumerate(zip(formatted[:-1], formatted[1:]))
+    ]
+
+
+def create_bin_expression(column: str, edges: List[float]) -> tuple:
+    """
+    Create a Polars expression that assigns each value of a numeric column to its bin.
+
+    Bins are closed on the left, except the last, which also holds the max. Each row gets
+    the index of its bin from a vectorized search of the sorted edges in the query plan,
+    so the data is never collected. Rows are grouped by index rather than by label, so
+    bins whose labels would look alike can never be merged.
+
+    Args:
+        column (str): The numeric column to bin
+        edges (List[float]): The bin edges from compute_bin_edges
+
+    Returns:
+        tuple: The expression, producing the bin index of each row in a "bin" column, and the
+            unique bin labels in ascending order, one per index
+    """
+    labels = _format_bin_labels(edges)
+    index = pl.lit(pl.Series(edges[1:-1], dtype=pl.Float64)).search_sorted(pl.col(column), side="right")
+    expression = pl.when(pl.col(column).is_not_null()).then(index.cast(pl.UInt32)).alias("bin")
+    return expression, labels
+
+
 def get_aggregation_expression(column: str, agg_type: str) -> pl.Expr:
     """
     Get the appropriate Polars aggregation expression for a column and aggregation type.
@@ -668,6 +869,68 @@ def get_aggregation_expression(column: str, agg_type: str) -> pl.Expr:
         return pl.col(column).count().alias(column)
 
 
+def aggregate_top_n(
+    lf: pl.LazyFrame, x_axis: str, agg_expressions: List[pl.Expr], n: int, other_label: str = "Other"
+) -> tuple:
+    """
+    Group a LazyFrame by its x-axis, keeping the n values with the largest measure and rolling
+    every other value into a single bucket.
+
+    The measure is the first aggregation expression, or the row count if there is none. The top
+    values are found with a partial top-k selection rather than a full sort, and the aggregations
+    are then recomputed over the bucketed x-axis, so the other bucket holds exact values.
+
+    Rows are grouped by the kept value and a flag marking the other bucket, so a kept value that
+    happens to equal other_label is never merged into the bucket. The bucket's label is suffixed
+    until it differs from every kept value.
+
+    Args:
+        lf (pl.LazyFrame): The data to aggregate
+        x_axis (str): The column to group by
+        agg_expressions (List[pl.Expr]): The aggregation expressions, with distinct output names
+        n (int): The number of x-axis values to keep
+        other_label (str, optional): The label of the bucket holding the remaining values
+
+    Returns:
+        tuple: The group keys as a DataFrame of the x-axis value as a string and the "__other" flag,
+            largest measure first and the other bucket last; the aggregated DataFrame keyed by the
+            same columns; and the chart label of each key
+    """
+    measure = agg_expressions[0] if agg_expressions else pl.len()
+    ranking = (
+        lf.group_by(x_axis)
+        .agg(measure.alias("__measure"))
+        .filter(pl.col("__measure").is_not_null())
+        .top_k(n, by="__measure")
+        .collect()
+        .sort("__measure", descending=True)
+    )
+    top_values = ranking[x_axis]
+
+    values = top_values.drop_nulls()
+    if values.dtype == pl.Categorical:
+        # Compare as strings, since the codes of a collected Categorical are not shared with the scan
+        values = values.cast(pl.Utf8)
+    in_top = pl.col(x_axis).is_in(values)
+    if top_values.null_count() > 0:
+        in_top = in_top | pl.col(x_axis).is_null()
+    group_keys = [
+        pl.when(in_top).then(pl.col(x_axis).cast(pl.Utf8)).alias(x_axis),
+        in_top.not_().alias("__other"),
+    ]
+
+    agg_result = lf.group_by(group_keys).agg(agg_expressions + [pl.len().alias("__rows")]).collect()
+
+    keys = top_values.cast(pl.Utf8).to_frame(x_axis).with_columns(pl.lit(False).alias("__other"))
+    labels = keys[x_axis].to_list()
+    if agg_result["__other"].any():
+        while other_label in labels:
+            other_label = f"{other_label} (grouped)"
+        keys = pl.concat([keys, pl.DataFrame({x_axis: [None], "__other": [True]}, schema=keys.schema)])
+        labels.append(other_label)
+    return keys, agg_result, labels
+
+
 def perform_axis_based_aggregation(
     df: Union[pl.DataFrame, pl.LazyFrame],
     x_axis: str,
@@ -676,6 +939,8 @@ def perform_axis_based_aggregation(
     y_axis_aggregations: Dict[str, str] = None,
     max_unique_values: int = 1000,
     sample_size: int = None,
+    top_n: Optional[int] = None,
+    other_label: str = "Other",
 ) -> Dict[str, Any]:
     """
     Perform aggregations based on column data types and axis roles (x-axis or y-axis).
@@ -690,8 +955,11 @@ def perform_axis_based_aggregation(
         y_axis (Union[str, List[str]]): The column name(s) to use as y-axis
         x_axis_aggregations (Dict[str, str], optional): Aggregations to apply to x-axis column
         y_axis_aggregations (Dict[str, str], optional): Aggregations to apply to y-axis columns
-        max_unique_values (int, optional): Maximum number of unique values to process for x-axis
+        max_unique_values (int, optional): Maximum number of x-axis values to chart. Beyond it only the
+            values with the largest measure are kept and the rest are grouped as other_label, see aggregate_top_n
         sample_size (int, optional): Number of rows to sample for large datasets
+        top_n (int, optional): Chart only the top_n x-axis values by the first y-axis measure, plus other_label
+        other_label (str, optional): The label of the bucket holding the remaining x-axis values
 
     Returns:
         Dict[str, Any]: A dictionary containing the aggregated data and metadata
@@ -709,7 +977,7 @@ def perform_axis_based_aggregation(
 
     # Apply sampling if requested (for very large datasets)
     if sample_size is not None:
-        total_rows = lf.select(pl.count()).collect().item()
+        total_rows = lf.select(pl.len()).collect().item()
         if total_rows > sample_size:
             print(f"Sampling {sample_size} rows from {total_rows} total rows")
             lf = lf.sample(sample_size, seed=42)
@@ -751,20 +1019,28 @@ def perform_axis_based_aggregation(
         x_axis = "time_period"
         result["metadata"]["x_axis"]["aggregation_type"] = x_agg
 
-    # Get unique values for x-axis to use as labels - limit to max_unique_values
-    x_axis_unique = working_lf.select(pl.col(x_axis).unique().sort()).collect()
-    x_axis_labels = x_axis_unique[x_axis].to_list()
-
-    # Check if we have too many unique values
-    if len(x_axis_labels) > max_unique_values:
-        print(f"Warning: X-axis has {len(x_axis_labels)} unique values, limiting to {max_unique_values}")
-        # For large number of unique values, we'll need to filter or bin the data
-        # For now, just take the first max_unique_values
-        x_axis_labels = x_axis_labels[:max_unique_values]
-        # Filter the working LazyFrame to only include these values
-        working_lf = working_lf.filter(pl.col(x_axis).is_in(x_axis_labels))
-
-    result["chart_data"]["labels"] = x_axis_labels
+    # Handle bins of a numeric x-axis, assigned in the query plan
+    bin_labels = None
+    chart_labels = None
+    bin_spec = parse_bin_spec(x_agg)
+    if bin_spec is not None:
+        if x_axis_type != "numeric":
+            raise ValueError(f"Cannot bin x-axis column '{x_axis}' of type {x_axis_type}")
+        edges = compute_bin_edges(working_lf, x_axis, bin_spec, max_unique_values)
+        bin_expr, bin_labels = create_bin_expression(x_axis, edges)
+        working_lf = working_lf.with_columns(bin_expr)
+
+        # Replace the x_axis with the bin column for grouping
+        x_axis = "bin"
+        result["metadata"]["x_axis"]["aggregation_type"] = "bins"
+        result["metadata"]["x_axis"]["bins"] = {"type": bin_spec["type"], "edges": edges}
+
+    # Count the unique x-axis values without materializing them; binned x-axes have a fixed set of labels
+    if bin_labels is not None:
+        num_unique = len(bin_labels)
+    else:
+        num_unique = working_lf.select(pl.col(x_axis).n_unique()).collect().item()
+    label_limit = min(top_n, max_unique_values) if top_n else max_unique_values
 
     # Generate a color palette for the datasets
     colors = [
@@ -779,7 +1055,8 @@ def perform_axis_based_aggregation(
 
     # Prepare aggregation expressions for all y-axes at once
     agg_expressions = []
-    for y_var in y_axes:
+    y_aggs = []
+    for i, y_var in enumerate(y_axes):
         y_agg = y_axis_aggregations.get(y_var) if y_axis_aggregations else None
         y_axis_type = get_column_type_from_schema(schema, y_var)
 
@@ -790,6 +1067,7 @@ def perform_axis_based_aggregation(
         # Check if this is a time-based aggregation on a date column
         if y_agg in ["daily", "monthly", "quarterly", "yearly"] and y_axis_type == "datetime":
             # Time-based aggregations for y-axis are handled separately
+            y_aggs.append(y_agg)
             continue
 
         # Determine the aggregation to use
@@ -799,14 +1077,57 @@ def perform_axis_based_aggregation(
                 y_agg = "mean"
             else:
                 y_agg = "count"
+        y_aggs.append(y_agg)
 
-        # Create the aggregation expression
-        agg_expr = get_aggregation_expression(y_var, y_agg)
+        # Create the aggregation expression, named by position so repeated columns do not clash
+        agg_expr = get_aggregation_expression(y_var, y_agg).alias(f"__y_{i}")
         agg_expressions.append(agg_expr)
 
+    # Compute every y-axis in a single group-by and align the values with the x-axis labels in one join
+    if bin_labels is not None:
+        # Every bin is charted, in ascending order, including empty ones
+        x_axis_unique = pl.DataFrame({x_axis: range(len(bin_labels))}, schema={x_axis: pl.UInt32})
+        chart_labels = bin_labels
+        agg_result = working_lf.group_by(x_axis).agg(agg_expressions + [pl.len().alias("__rows")]).collect()
+    elif num_unique > label_limit:
+        # Keep the values with the largest measure and group the rest, rather than dropping them
+        print(f"X-axis has {num_unique} unique values, keeping the top {label_limit} and grouping the rest")
+        x_axis_unique, agg_result, chart_labels = aggregate_top_n(
+            working_lf, x_axis, agg_expressions, label_limit, other_label
+        )
+        ranked_by = next(
+            (
+                f"{y_agg} of {y_var}"
+                for y_var, y_agg in zip(y_axes, y_aggs)
+                if y_agg not in ["daily", "monthly", "quarterly", "yearly"]
+            ),
+            "count",
+        )
+        result["metadata"]["x_axis"]["top_n"] = {
+            "n": label_limit,
+            "unique_values": num_unique,
+            "ranked_by": ranked_by,
+            "other_label": chart_labels[-1] if x_axis_unique["__other"].any() else other_label,
+        }
+    else:
+        label_expr = pl.col(x_axis).unique()
+        if working_lf.collect_schema()[x_axis] == pl.Categorical:
+            # Categorical columns sort by code; sort their labels as strings instead
+            label_expr = label_expr.cast(pl.Utf8)
+        x_axis_unique = working_lf.select(label_expr.sort()).collect()
+        agg_result = working_lf.group_by(x_axis).agg(agg_expressions + [pl.len().alias("__rows")]).collect()
+
+    result["chart_data"]["labels"] = chart_labels if chart_labels is not None else x_axis_unique[x_axis].to_list()
+
+    # Every row falls in exactly one group, so the group sizes add up to the row count without another scan
+    result["metadata"]["num_rows"] = agg_result["__rows"].sum()
+
+    # A left join on every key column keeps the label order; null labels are matched like any other label
+    agg_result = agg_result.with_columns(pl.col(x_axis).cast(x_axis_unique.schema[x_axis]))
+    aligned = x_axis_unique.join(agg_result, on=x_axis_unique.columns, how="left", nulls_equal=True)
+
     # Process each y-axis variable
-    for i, y_var in enumerate(y_axes):
-        y_agg = y_axis_aggregations.get(y_var) if y_axis_aggregations else None
+    for i, (y_var, y_agg) in enumerate(zip(y_axes, y_aggs)):
         y_axis_type = get_column_type_from_schema(schema, y_var)
 
         # Check if this is a time-based aggregation on a date column
@@ -827,28 +1148,10 @@ def perform_axis_based_aggregation(
             result["chart_data"]["datasets"].append(dataset)
             continue
 
-        # Set default aggregation if not specified
-        if not y_agg:
-            if y_axis_type == "numeric":
-                y_agg = "mean"
-            else:
-                y_agg = "count"
-
-        # Execute the aggregation query
-        agg_expr = get_aggregation_expression(y_var, y_agg)
-        agg_result = working_lf.group_by(x_axis).agg(agg_expr).collect()
-
-        # Sort the result by x-axis
-        agg_result = agg_result.sort(x_axis)
-
-        # Ensure all x-axis labels have corresponding y values
-        y_values = []
-        for label in x_axis_labels:
-            row = agg_result.filter(pl.col(x_axis) == label)
-            if row.height > 0:
-                y_values.append(row[0, y_var])
-            else:
-                y_values.append(0)  # Use 0 for missing values
+        # Use 0 for labels without a group
+        y_values = aligned.select(
+            pl.when(pl.col("__rows").is_null()).then(0).otherwise(pl.col(f"__y_{i}")).alias(y_var)
+        )[y_var].to_list()
 
         # Create dataset label
         dataset_label = f"{y_agg} of {y_var}"
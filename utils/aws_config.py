@@ -1,28 +1,188 @@
+import hashlib
+import itertools
+import json
 import os
+import shutil
 import tempfile
+import threading
 from datetime import datetime
 
-import boto3
-from botocore.client import Config
 from botocore.exceptions import ClientError
 
 from django.conf import settings
 
+from utils.column_encoding import (
+    cast_columns,
+    cast_schema,
+    choose_column_casts,
+    get_column_dictionaries,
+)
+from utils.csv_dialect import csv_read_options, sniff_csv_dialect, transcode_to_utf8
+from utils.multipart_upload import MultipartUploadWriter
+from utils.parquet_cache import get_parquet_cache
+from utils.parquet_layout import (
+    apply_parquet_layout,
+    choose_parquet_layout,
+    parquet_layout_issues,
+    parquet_write_options,
+)
+from utils.s3_client import build_s3_client, build_transfer_config
+from utils.storage import get_storage_backend
+
+_s3_client = None
+_s3_client_pid = None
+_s3_client_lock = threading.Lock()
+_transfer_config = None
+_presign_client = None
+_presign_client_pid = None
+_presign_client_lock = threading.Lock()
+
 
 def get_boto_client():
-    session = boto3.Session(
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID, aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY
-    )
-    config = Config(
-        signature_version="s3v4",
-        retries={
-            "total_max_attempts": 3,  # Retry up to 3 times for faster error handling
-            "mode": "standard",  # Standard retry mode for quicker retries
+    """
+    Get the process-wide pooled S3 client.
+
+    boto3 clients are thread-safe, so one client (and its connection pool) is shared
+    by all threads of a process. The client is rebuilt after a fork, since pooled
+    connections must not be shared between Celery or gunicorn worker processes.
+
+    Returns:
+        botocore.client.S3: The S3 client
+    """
+    global _s3_client, _s3_client_pid
+
+    pid = os.getpid()
+    if _s3_client is None or _s3_client_pid != pid:
+        with _s3_client_lock:
+            if _s3_client is None or _s3_client_pid != pid:
+                _s3_client = build_s3_client(
+                    settings.AWS_ACCESS_KEY_ID,
+                    settings.AWS_SECRET_ACCESS_KEY,
+                    settings.AWS_ENDPOINT,
+                    region_name=settings.AWS_REGION,
+                    max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                )
+                _s3_client_pid = pid
+    return _s3_client
+
+
+def get_transfer_config():
+    """
+    Get the shared transfer configuration for multipart uploads and downloads.
+
+    Returns:
+        TransferConfig: The transfer configuration
+    """
+    global _transfer_config
+
+    if _transfer_config is None:
+        _transfer_config = build_transfer_config(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE,
+            max_concurrency=settings.S3_MAX_CONCURRENCY,
+        )
+    return _transfer_config
+
+
+def get_presign_client():
+    """
+    Get the S3 client used to presign URLs that browsers upload to.
+
+    Presigned URLs embed the endpoint they were signed for, so when S3/Minio is reached
+    through a different address from outside (S3_PUBLIC_ENDPOINT), a separate client
+    signs for that address. Like the pooled client, it is rebuilt after a fork.
+
+    Returns:
+        botocore.client.S3: The S3 client
+    """
+    global _presign_client, _presign_client_pid
+
+    if not settings.S3_PUBLIC_ENDPOINT or settings.S3_PUBLIC_ENDPOINT == settings.AWS_ENDPOINT:
+        return get_boto_client()
+
+    pid = os.getpid()
+    if _presign_client is None or _presign_client_pid != pid:
+        with _presign_client_lock:
+            if _presign_client is None or _presign_client_pid != pid:
+                _presign_client = build_s3_client(
+                    settings.AWS_ACCESS_KEY_ID,
+                    settings.AWS_SECRET_ACCESS_KEY,
+                    settings.S3_PUBLIC_ENDPOINT,
+                    region_name=settings.AWS_REGION,
+                )
+                _presign_client_pid = pid
+    return _presign_client
+
+
+def create_presigned_multipart_upload(s3_path, size):
+    """
+    Starts a multipart upload that a browser completes by sending parts straight to S3/Minio.
+
+    Args:
+        s3_path (str): The S3 key to upload to.
+        size (int): Size of the file in bytes.
+
+    Returns:
+        dict: The upload id, the part size and a presigned PUT URL for every part.
+    """
+    # S3 allows at most 10,000 parts, so very large files get larger parts
+    part_size = max(settings.PRESIGNED_UPLOAD_PART_SIZE, -(-size // 10000))
+    part_count = max(1, -(-size // part_size))
+
+    s3 = get_boto_client()
+    upload_id = s3.create_multipart_upload(Bucket=settings.AWS_BUCKET, Key=s3_path)["UploadId"]
+
+    presign_client = get_presign_client()
+    parts = [
+        {
+            "part_number": part_number,
+            "url": presign_client.generate_presigned_url(
+                "upload_part",
+                Params={
+                    "Bucket": settings.AWS_BUCKET,
+                    "Key": s3_path,
+                    "UploadId": upload_id,
+                    "PartNumber": part_number,
+                },
+                ExpiresIn=settings.PRESIGNED_URL_EXPIRES_SECONDS,
+            ),
+        }
+        for part_number in range(1, part_count + 1)
+    ]
+    return {"upload_id": upload_id, "key": s3_path, "part_size": part_size, "parts": parts}
+
+
+def complete_presigned_multipart_upload(s3_path, upload_id, parts):
+    """
+    Completes a multipart upload whose parts were sent by a browser.
+
+    Args:
+        s3_path (str): The S3 key of the upload.
+        upload_id (str): The id returned by create_presigned_multipart_upload.
+        parts (list): Dicts with the 'part_number' and 'etag' of every uploaded part.
+    """
+    get_boto_client().complete_multipart_upload(
+        Bucket=settings.AWS_BUCKET,
+        Key=s3_path,
+        UploadId=upload_id,
+        MultipartUpload={
+            "Parts": [
+                {"PartNumber": part["part_number"], "ETag": part["etag"]}
+                for part in sorted(parts, key=lambda part: part["part_number"])
+            ]
         },
-        read_timeout=200,  # Set the read timeout to 120 seconds
     )
-    s3 = session.client("s3", endpoint_url=settings.AWS_ENDPOINT, config=config)
-    return s3
+
+
+def abort_presigned_multipart_upload(s3_path, upload_id):
+    """
+    Aborts a browser multipart upload and discards its uploaded parts.
+
+    Args:
+        s3_path (str): The S3 key of the upload.
+        upload_id (str): The id returned by create_presigned_multipart_upload.
+    """
+    get_boto_client().abort_multipart_upload(Bucket=settings.AWS_BUCKET, Key=s3_path, UploadId=upload_id)
 
 
 def upload_temp_file(request, file):
@@ -39,7 +199,7 @@ def upload_temp_file(request, file):
         temp_file_path = temp_file.name
     s3_path = f'datasets/{request.user.email.replace("@", "_").replace(".", "_")}/temp-folder/{new_filename}'
     try:
-        s3.upload_file(temp_file_path, settings.AWS_BUCKET, s3_path)
+        s3.upload_file(temp_file_path, settings.AWS_BUCKET, s3_path, Config=get_transfer_config())
     except Exception as e:
         raise e
 
@@ -63,12 +223,51 @@ def upload_file_to_s3(file_path, clean_filename, user_email="admin"):
     s3 = get_boto_client()
     s3_path = f'datasets/{user_email.replace("@", "_").replace(".", "_")}/{clean_filename}'
     try:
-        s3.upload_file(file_path, settings.AWS_BUCKET, s3_path)
+        s3.upload_file(file_path, settings.AWS_BUCKET, s3_path, Config=get_transfer_config())
     except Exception as e:
         raise e
     return s3_path
 
 
+def hash_file(file_path, chunk_size=1024 * 1024):
+    """
+    Computes the SHA-256 digest of a local file.
+
+    Args:
+        file_path (str): The local path to the file.
+        chunk_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_content_key(content_hash, **options):
+    """
+    Derives the storage key of a converted dataset from its raw content.
+
+    Ingest options that change the written Parquet (e.g. the clustering column) are
+    folded into the key, so the same upload converted differently gets its own object.
+
+    Args:
+        content_hash (str): SHA-256 hex digest of the raw upload.
+        **options: Ingest options that affect the converted output. None values are ignored.
+
+    Returns:
+        str: The content key, a SHA-256 hex digest.
+    """
+    options = {name: value for name, value in options.items() if value is not None}
+    if not options:
+        return content_hash
+    payload = json.dumps({"content": content_hash, "options": options}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 def detect_and_convert_date_columns(df):
     """
     Detects and converts string columns that contain date values to datetime type.
@@ -79,8 +278,6 @@ def detect_and_convert_date_columns(df):
     Returns:
         pl.DataFrame: DataFrame with date columns converted to datetime type
     """
-    import re
-
     import polars as pl
 
     # Common date patterns to check
@@ -97,25 +294,22 @@ def detect_and_convert_date_columns(df):
         r"^\d{1,2}/\d{1,2}/\d{4}\s+\d{1,2}:\d{2}",
     ]
 
-    # Function to check if a string matches any date pattern
-    def is_date_string(s):
-        if not isinstance(s, str):
-            return False
-        return any(re.match(pattern, s) for pattern in date_patterns)
+    # Single pattern so the sample is matched in one vectorized pass
+    combined_pattern = "|".join(f"(?:{pattern})" for pattern in date_patterns)
 
     # Check each string column
     for col_name in df.columns:
         if df.schema[col_name] == pl.Utf8:  # Only check string columns
             # Get a sample of non-null values
-            sample = df[col_name].drop_nulls().head(100).to_list()
+            sample = df[col_name].drop_nulls().head(100)
 
             # Skip if no samples
-            if not sample:
+            if sample.len() == 0:
                 continue
 
             # Check if most values match date patterns
-            date_count = sum(1 for val in sample if is_date_string(val))
-            if date_count > len(sample) * 0.8:  # If more than 80% match date patterns
+            date_count = sample.str.contains(combined_pattern).sum()
+            if date_count > sample.len() * 0.8:  # If more than 80% match date patterns
                 print(f"Converting column '{col_name}' to datetime type")
                 try:
                     # Try to convert to datetime
@@ -127,109 +321,523 @@ def detect_and_convert_date_columns(df):
     return df
 
 
-def upload_dataset_to_s3(file_path, filename, extract_metadata=False):
+def open_multipart_upload(s3_path):
+    """
+    Opens a parallel, checksummed multipart upload to S3/Minio.
+
+    Args:
+        s3_path (str): The S3 key to upload to.
+
+    Returns:
+        MultipartUploadWriter: A writable file object; use it as a context manager.
+    """
+    return MultipartUploadWriter(
+        get_boto_client(),
+        settings.AWS_BUCKET,
+        s3_path,
+        part_size=settings.S3_MULTIPART_CHUNKSIZE,
+        max_workers=settings.S3_MAX_CONCURRENCY,
+        max_retries=settings.S3_PART_MAX_RETRIES,
+    )
+
+
+def upload_file_multipart(file_path, s3_path):
+    """
+    Uploads a local file to S3/Minio as a parallel, checksummed multipart upload.
+
+    Args:
+        file_path (str): The local path to the file.
+        s3_path (str): The S3 key to upload to.
+    """
+    with open_multipart_upload(s3_path) as writer, open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(settings.S3_MULTIPART_CHUNKSIZE)
+            if not chunk:
+                break
+            writer.write(chunk)
+
+
+def stream_csv_to_parquet(
+    file_path, parquet_path, dialect=None, sample_rows=10000, cluster_by=None, downcast_numeric=True
+):
+    """
+    Converts a CSV file to Parquet without materializing it in memory.
+
+    Date columns are detected on a small sample, then the whole file is scanned,
+    cast and written by Polars' streaming engine, so peak memory stays bounded
+    regardless of the file size. A file that is not UTF-8 is first transcoded to a
+    temporary UTF-8 copy, since the streaming reader only supports UTF-8.
+
+    Args:
+        file_path (str): The local path to the CSV file.
+        parquet_path (str): The local path to write the Parquet file to.
+        dialect (dict, optional): The CSV dialect from sniff_csv_dialect. Detected if not provided.
+        sample_rows (int): Number of rows read to detect date columns.
+        cluster_by (str, optional): A column to cluster rows by. See choose_parquet_layout.
+        downcast_numeric (bool): Whether to narrow numeric columns. See choose_numeric_downcasts.
+
+    Returns:
+        dict: The Parquet layout the file was written with.
+    """
+    import polars as pl
+
+    if dialect is None:
+        dialect = sniff_csv_dialect(file_path)
+
+    utf8_path = None
+    try:
+        scan_path = file_path
+        if dialect.get("encoding", "utf8") != "utf8":
+            fd, utf8_path = tempfile.mkstemp(suffix=".csv", dir=os.path.dirname(parquet_path))
+            os.close(fd)
+            print(f"Transcoding {file_path} from {dialect['encoding']} to UTF-8...")
+            transcode_to_utf8(file_path, dialect["encoding"], utf8_path)
+            scan_path = utf8_path
+            dialect = {**dialect, "encoding": "utf8"}
+        read_options = csv_read_options(dialect)
+
+        # Detect date columns on a sample only
+        sample_df = pl.read_csv(scan_path, n_rows=sample_rows, infer_schema_length=sample_rows, **read_options)
+        lf = pl.scan_csv(scan_path, infer_schema_length=sample_rows, **read_options)
+
+        print(f"Streaming {file_path} to Parquet...")
+        return sink_to_parquet(lf, sample_df, parquet_path, cluster_by=cluster_by, downcast_numeric=downcast_numeric)
+    finally:
+        if utf8_path:
+            os.remove(utf8_path)
+
+
+def stream_ndjson_to_parquet(
+    file_path, parquet_path, sample_rows=10000, cluster_by=None, batch_rows=100000, downcast_numeric=True
+):
+    """
+    Converts a newline-delimited JSON file to Parquet without materializing it in memory.
+
+    The streaming engine cannot read NDJSON, so the file is parsed in batches of lines
+    and each batch is spilled to a temporary Parquet file. Every batch infers its own
+    schema from all of its lines, and the batches are combined with relaxed types, so a
+    field that only widens or appears late in the file, such as an integer id that
+    later holds floats, is stored with a type that fits every row.
+
+    Args:
+        file_path (str): The local path to the NDJSON file.
+        parquet_path (str): The local path to write the Parquet file to.
+        sample_rows (int): Number of rows read to detect date and categorical columns.
+        cluster_by (str, optional): A column to cluster rows by. See choose_parquet_layout.
+        batch_rows (int): Number of lines parsed at a time.
+        downcast_numeric (bool): Whether to narrow numeric columns. See choose_numeric_downcasts.
+
+    Returns:
+        dict: The Parquet layout the file was written with.
+    """
+    from io import BytesIO
+
+    import polars as pl
+
+    batch_dir = tempfile.mkdtemp(dir=os.path.dirname(parquet_path))
+    try:
+        batch_paths = []
+        with open(file_path, "rb") as f:
+            while True:
+                lines = list(itertools.islice(f, batch_rows))
+                if not lines:
+                    break
+                batch = pl.read_ndjson(BytesIO(b"".join(lines)), infer_schema_length=None)
+                batch_path = os.path.join(batch_dir, f"batch-{len(batch_paths):06d}.parquet")
+                batch.write_parquet(batch_path, compression="lz4")
+                batch_paths.append(batch_path)
+
+        if not batch_paths:
+            raise ValueError("NDJSON file is empty")
+
+        lf = pl.concat([pl.scan_parquet(path) for path in batch_paths], how="diagonal_relaxed")
+        sample_df = lf.head(sample_rows).collect()
+
+        print(f"Streaming {file_path} to Parquet...")
+        return sink_to_parquet(
+            lf,
+            sample_df,
+            parquet_path,
+            cluster_by=cluster_by,
+            downcast_numeric=downcast_numeric,
+        )
+    finally:
+        shutil.rmtree(batch_dir, ignore_errors=True)
+
+
+def sink_to_parquet(lf, sample_df, parquet_path, cluster_by=None, downcast_numeric=True, casts=None):
     """
-    Reads a CSV or Excel file, converts it to Parquet, and uploads it to S3/Minio.
+    Writes a LazyFrame to a Parquet file with the streaming engine.
+
+    Date columns and low-cardinality string columns are detected on a small sample
+    of the data and cast in the streaming plan, so peak memory stays bounded
+    regardless of the input size. Numeric columns are narrowed after a streaming
+    pass over the data to find their ranges.
 
     Args:
-        file_path (str): The local path to the file (CSV or Excel).
-        filename (str): The name to store the file as in S3.
+        lf (pl.LazyFrame): The data to write.
+        sample_df (pl.DataFrame): The first rows of the data, used to detect date and categorical columns.
+        parquet_path (str): The local path to write the Parquet file to.
+        cluster_by (str, optional): A column to cluster rows by. See choose_parquet_layout.
+        downcast_numeric (bool): Whether to narrow numeric columns. See choose_numeric_downcasts.
+        casts (dict, optional): Column types from choose_column_casts, if already chosen.
+
+    Returns:
+        dict: The Parquet layout the file was written with.
+    """
+    import polars as pl
+
+    converted_df = detect_and_convert_date_columns(sample_df)
+    date_columns = [col for col, dtype in sample_df.schema.items() if converted_df.schema[col] != dtype]
+    if date_columns:
+        lf = lf.with_columns([pl.col(col).str.to_datetime(strict=False).alias(col) for col in date_columns])
+
+    if casts is None:
+        casts = choose_column_casts(converted_df, lf, downcast_numeric=downcast_numeric)
+    layout = choose_parquet_layout(cast_schema(lf.collect_schema(), casts), cluster_by=cluster_by)
+    # Sort before encoding, so clustered row groups hold lexically adjacent values
+    lf = apply_parquet_layout(lf, layout)
+    lf = cast_columns(lf, casts)
+
+    lf.sink_parquet(parquet_path, **parquet_write_options(layout))
+    return layout
+
+
+def upload_dataset_to_s3(
+    file_path,
+    filename,
+    extract_metadata=False,
+    streaming=None,
+    dialect=None,
+    cluster_by=None,
+    partition_by_date=None,
+    content_key=None,
+    sheet_name=None,
+    downcast_numeric=True,
+):
+    """
+    Reads a CSV, Excel, NDJSON or Parquet file, converts it to Parquet, and uploads it to the
+    configured storage backend. Parquet files are stored as they are unless their layout needs fixing.
+    Compressed files must be expanded first, see decompress_upload. Columns are stored with compact
+    types: low-cardinality strings as Categorical and numbers in the narrowest safe type, see
+    choose_column_casts.
+
+    Args:
+        file_path (str): The local path to the file.
+        filename (str): The original name of the file, used to detect its type.
         extract_metadata (bool): Whether to extract and return metadata about the file.
+        streaming (bool, optional): Whether to convert the file with bounded memory, using the
+            streaming engine. Defaults to streaming CSV files larger than STREAMING_INGEST_MIN_BYTES
+            and .xlsx files larger than EXCEL_STREAMING_MIN_BYTES.
+        dialect (dict, optional): A previously detected CSV dialect. Detected from the file if not provided.
+        cluster_by (str, optional): A column to cluster rows by, so that filters on it can skip
+            row groups. Defaults to the first date column, see choose_parquet_layout.
+        partition_by_date (bool, optional): Whether to store the dataset as a year/month partitioned
+            directory. Defaults to partitioning files larger than PARTITIONED_STORAGE_MIN_BYTES.
+        content_key (str, optional): The content key from get_content_key, which names the stored
+            object. Computed from the file if not provided.
+        sheet_name (str, optional): The sheet of an Excel workbook to convert. Defaults to the first sheet.
+        downcast_numeric (bool): Whether to narrow numeric columns to the smallest type that holds
+            their values. See choose_numeric_downcasts.
 
     Returns:
         dict: Dictionary containing the S3 URL and metadata if extract_metadata is True,
               otherwise just the S3 URL as a string.
     """
     import os
-    from io import BytesIO
 
     import polars as pl
 
     from utils.aggregate import extract_dataset_metadata
+    from utils.excel_ingest import EXCEL_CSV_DIALECT, read_excel_sheet, write_excel_sheet_csv
+    from utils.ingest_formats import validate_parquet_schema
+    from utils.partitioned_storage import choose_partition_column, write_partitioned_parquet
 
     # Determine file type based on extension (case-insensitive)
     file_extension = os.path.splitext(filename.lower())[1]
 
+    if streaming is None:
+        # Workbooks are compressed, so they expand far more than CSV files once read
+        if file_extension == ".xlsx":
+            streaming = os.path.getsize(file_path) >= settings.EXCEL_STREAMING_MIN_BYTES
+        else:
+            streaming = os.path.getsize(file_path) >= settings.STREAMING_INGEST_MIN_BYTES
+
+    parquet_path = None
+    layout = None
+
+    # Detect the CSV dialect once from the first few KB, unless a re-ingest already knows it
+    if file_extension == ".csv" and dialect is None:
+        dialect = sniff_csv_dialect(file_path)
+        print(f"Detected CSV dialect: {dialect}")
+
     # Read file based on its extension
-    if file_extension in [".xlsx", ".xls"]:
-        # Read Excel file using Polars
+    if file_extension == ".csv" and streaming:
+        # Stream the CSV into a temporary Parquet file on disk
+        fd, parquet_path = tempfile.mkstemp(suffix=".parquet")
+        os.close(fd)
+        try:
+            layout = stream_csv_to_parquet(
+                file_path, parquet_path, dialect=dialect, cluster_by=cluster_by, downcast_numeric=downcast_numeric
+            )
+        except Exception as e:
+            os.remove(parquet_path)
+            print(f"Error streaming CSV file: {str(e)}")
+            raise
+        df = pl.scan_parquet(parquet_path)
+    elif file_extension == ".xlsx" and streaming:
+        # Write the sheet row by row to a CSV file, then stream that into a temporary Parquet file
+        fd, csv_path = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        fd, parquet_path = tempfile.mkstemp(suffix=".parquet")
+        os.close(fd)
+        try:
+            write_excel_sheet_csv(file_path, csv_path, sheet_name=sheet_name)
+            layout = stream_csv_to_parquet(
+                csv_path,
+                parquet_path,
+                dialect=EXCEL_CSV_DIALECT,
+                cluster_by=cluster_by,
+                downcast_numeric=downcast_numeric,
+            )
+        except Exception as e:
+            os.remove(parquet_path)
+            print(f"Error streaming Excel file: {str(e)}")
+            raise
+        finally:
+            os.remove(csv_path)
+        df = pl.scan_parquet(parquet_path)
+    elif file_extension in [".xlsx", ".xls"]:
+        # Read Excel file using Polars, with the calamine engine when available
         try:
-            df = pl.read_excel(file_path, engine="openpyxl")
+            df = read_excel_sheet(file_path, sheet_name=sheet_name)
         except Exception as e:
             print(f"Error reading Excel file: {str(e)}")
             raise
     elif file_extension == ".csv":
-        # Read CSV file using Polars
+        # Read CSV file using Polars, in a single parse driven by the detected dialect
         try:
-            # Try to infer delimiter and other parameters
-            df = pl.read_csv(file_path, infer_schema_length=10000)
+            df = pl.read_csv(file_path, infer_schema_length=10000, **csv_read_options(dialect))
         except Exception as e:
             print(f"Error reading CSV file: {str(e)}")
-            # Fallback to common delimiters if inference fails
+            raise
+    elif file_extension in [".ndjson", ".jsonl"] and streaming:
+        # Stream the NDJSON into a temporary Parquet file on disk
+        fd, parquet_path = tempfile.mkstemp(suffix=".parquet")
+        os.close(fd)
+        try:
+            layout = stream_ndjson_to_parquet(
+                file_path, parquet_path, cluster_by=cluster_by, downcast_numeric=downcast_numeric
+            )
+        except Exception as e:
+            os.remove(parquet_path)
+            print(f"Error streaming NDJSON file: {str(e)}")
+            raise
+        df = pl.scan_parquet(parquet_path)
+    elif file_extension in [".ndjson", ".jsonl"]:
+        try:
+            df = pl.read_ndjson(file_path, infer_schema_length=10000)
+        except Exception as e:
+            print(f"Error reading NDJSON file: {str(e)}")
+            raise
+    elif file_extension == ".parquet":
+        # Parquet is already typed, so the upload is stored as it is unless its layout needs fixing
+        lf = pl.scan_parquet(file_path)
+        validate_parquet_schema(lf.collect_schema())
+        sample_df = lf.head(10000).collect()
+        converted_df = detect_and_convert_date_columns(sample_df)
+        casts = choose_column_casts(converted_df, lf, downcast_numeric=downcast_numeric)
+        layout = choose_parquet_layout(cast_schema(converted_df.schema, casts), cluster_by=cluster_by)
+
+        issues = parquet_layout_issues(file_path, layout)
+        if converted_df.schema != sample_df.schema:
+            issues.append("date columns stored as strings")
+        if casts:
+            issues.append("columns stored with wider types than needed")
+
+        if issues:
+            print(f"Rewriting Parquet upload: {', '.join(issues)}")
+            fd, parquet_path = tempfile.mkstemp(suffix=".parquet")
+            os.close(fd)
             try:
-                df = pl.read_csv(file_path, separator=",")
-            except:
-                try:
-                    df = pl.read_csv(file_path, separator=";")
-                except:
-                    try:
-                        df = pl.read_csv(file_path, separator="\t")
-                    except Exception as e2:
-                        print(f"Failed to read CSV with common delimiters: {str(e2)}")
-                        raise
+                layout = sink_to_parquet(lf, sample_df, parquet_path, cluster_by=cluster_by, casts=casts)
+            except Exception as e:
+                os.remove(parquet_path)
+                print(f"Error rewriting Parquet file: {str(e)}")
+                raise
+        else:
+            print("Parquet upload already has a suitable layout, storing it without rewriting")
+            parquet_path = file_path
+        df = pl.scan_parquet(parquet_path)
     else:
-        raise ValueError(f"Unsupported file type: {file_extension}. Only .csv, .xlsx, and .xls are supported.")
+        raise ValueError(
+            f"Unsupported file type: {file_extension}. Only .csv, .xlsx, .xls, .parquet, .ndjson and .jsonl "
+            "are supported."
+        )
 
-    # Detect and convert date columns
-    print("Detecting and converting date columns...")
-    df = detect_and_convert_date_columns(df)
+    try:
+        if parquet_path is None:
+            # Detect and convert date columns
+            print("Detecting and converting date columns...")
+            df = detect_and_convert_date_columns(df)
 
-    # Extract metadata if requested
-    metadata = None
-    if extract_metadata:
-        metadata = extract_dataset_metadata(df)
+            # Store low-cardinality strings dictionary-encoded and numbers in their narrowest safe type
+            casts = choose_column_casts(df, downcast_numeric=downcast_numeric)
 
-    # Convert to Parquet with Snappy compression (optimized for speed & size)
-    parquet_buffer = BytesIO()
-    df.write_parquet(parquet_buffer, compression="snappy")
-    parquet_buffer.seek(0)  # Reset buffer position
+            # Size row groups for the row width and cluster rows so statistics can prune reads
+            layout = choose_parquet_layout(cast_schema(df.schema, casts), cluster_by=cluster_by)
+            df = apply_parquet_layout(df, layout)
+            df = cast_columns(df, casts)
 
-    # Get S3 client
-    s3 = get_boto_client()
+        # Extract metadata if requested
+        metadata = None
+        if extract_metadata:
+            metadata = extract_dataset_metadata(df)
+            # Record the resolved schema so readers never need to re-run date detection
+            metadata["schema"] = {col: str(dtype) for col, dtype in df.collect_schema().items()}
+            if dialect is not None:
+                # Re-ingests of this dataset can skip dialect detection
+                metadata["csv_dialect"] = dialect
+            metadata["parquet_layout"] = layout
+            # Dictionaries of the categorical columns, e.g. for filter pickers
+            metadata["dictionaries"] = get_column_dictionaries(df)
+
+        # Name the Parquet object after the upload's content, so uploads never overwrite each other
+        # and the key of an object never changes once written
+        if content_key is None:
+            content_key = get_content_key(
+                hash_file(file_path),
+                cluster_by=cluster_by,
+                partition_by_date=partition_by_date,
+                sheet_name=sheet_name,
+                downcast_numeric=None if downcast_numeric else False,
+            )
+        base_filename = content_key
+        parquet_filename = f"{base_filename}.parquet"
 
-    # Define new Parquet filename (preserve original name but change extension)
-    base_filename = os.path.splitext(filename)[0]
-    parquet_filename = f"{base_filename}.parquet"
+        # Define S3 path
+        s3_path = f"datasets/{parquet_filename}"
 
-    # Define S3 path
-    s3_path = f"datasets/{parquet_filename}"
+        # Large datasets with a date column are stored as year=/month= partitions
+        partition_column = choose_partition_column(
+            df.collect_schema(), os.path.getsize(file_path), layout, partition_by_date
+        )
+        partitions = None
 
-    # Upload Parquet file to S3
-    try:
-        s3.upload_fileobj(parquet_buffer, settings.AWS_BUCKET, s3_path)
+        # Upload Parquet file to the storage backend
+        storage = get_storage_backend()
+        try:
+            if partition_column is not None:
+                s3_path = f"datasets/{base_filename}"
+                partitions = write_partitioned_parquet(
+                    df, partition_column, s3_path, parquet_write_options(layout), sort_by=layout.get("sort_by")
+                )
+            elif parquet_path is not None:
+                # Upload straight from the spooled file (a parallel multipart upload on S3)
+                storage.upload_file(parquet_path, s3_path)
+            else:
+                # Convert to Parquet with Snappy compression (optimized for speed & size),
+                # sending parts concurrently as they are written
+                with storage.open_writer(s3_path) as writer:
+                    df.write_parquet(writer, **parquet_write_options(layout))
+
+            # Generate a URL for the file
+            url = storage.url(s3_path)
+
+            print("*********************")
+            print("S3 URL:", url)
+
+            if extract_metadata:
+                result = {
+                    "url": url,
+                    "filename": parquet_filename,
+                    "s3_path": s3_path,
+                    "content_hash": content_key,
+                    "metadata": metadata,
+                }
+                if partitions is not None:
+                    result["partition_column"] = partition_column
+                    result["partitions"] = partitions
+                return result
+            else:
+                return url
 
-        # Generate a URL for the file
-        url = f"{settings.AWS_ENDPOINT}/{settings.AWS_BUCKET}/{s3_path}"
+        except Exception as e:
+            print(f"Error uploading to S3: {str(e)}")
+            raise
+    finally:
+        # Parquet uploads stored as they are belong to the caller
+        if parquet_path is not None and parquet_path != file_path and os.path.exists(parquet_path):
+            os.remove(parquet_path)
 
-        print("*********************")
-        print("S3 URL:", url)
 
-        if extract_metadata:
-            return {"url": url, "filename": parquet_filename, "s3_path": s3_path, "metadata": metadata}
-        else:
-            return url
+def get_dataset_s3_path(file_name):
+    """
+    Get the S3 key of a dataset's Parquet file.
 
-    except Exception as e:
-        print(f"Error uploading to S3: {str(e)}")
-        raise
+    Args:
+        file_name (str): The name of the dataset file (any extension).
+
+    Returns:
+        str: The S3 key of the Parquet file.
+    """
+    # Determine file extension (case-insensitive)
+    file_extension = os.path.splitext(file_name.lower())[1]
+
+    # Define Parquet filename based on original file extension
+    if file_extension != ".parquet":
+        base_filename = os.path.splitext(file_name)[0]
+        parquet_filename = f"{base_filename}.parquet"
+    else:
+        parquet_filename = file_name
+
+    return f"datasets/{parquet_filename}"
+
+
+def get_s3_storage_options():
+    """
+    Get the object store options Polars needs to read directly from S3/Minio.
+
+    Returns:
+        dict: Storage options for pl.scan_parquet.
+    """
+    return {
+        "aws_access_key_id": settings.AWS_ACCESS_KEY_ID,
+        "aws_secret_access_key": settings.AWS_SECRET_ACCESS_KEY,
+        "aws_endpoint_url": settings.AWS_ENDPOINT,
+        "aws_region": settings.AWS_REGION,
+        "aws_allow_http": str(bool(settings.AWS_ENDPOINT) and settings.AWS_ENDPOINT.startswith("http://")).lower(),
+    }
+
+
+def scan_parquet_from_s3(file_name):
+    """
+    Lazily scans a Parquet file directly on the storage backend without downloading it.
+
+    On S3/Minio the Parquet footer is fetched first and only the column chunks and row
+    groups that survive projection and predicate pushdown are read, using ranged GETs.
+
+    Args:
+        file_name (str): The name of the file to scan.
+
+    Returns:
+        pl.LazyFrame: A Polars LazyFrame backed by the remote object.
+    """
+    return get_storage_backend().scan_parquet(get_dataset_s3_path(file_name))
 
 
-def get_file_from_s3(file_name):
+def get_file_from_s3(file_name, version=None):
     """
-    Retrieves a file from S3/Minio and loads it into a Polars DataFrame.
+    Retrieves a file from the storage backend and loads it into a Polars LazyFrame.
+    Downloads go through the local Parquet disk cache when it is enabled, and files
+    on the local backend are scanned in place (memory-mapped by Polars). No type
+    conversion happens here: date columns are written as real Date/Datetime types
+    at ingest and the resolved schema is recorded in the dataset metadata.
 
     Args:
         file_name (str): The name of the file to retrieve.
+        version (str, optional): A known version of the object, such as the content hash of a
+            content-addressed object. Skips the freshness check against the storage backend.
 
     Returns:
         pl.LazyFrame: A Polars LazyFrame containing the file data.
@@ -239,47 +847,33 @@ def get_file_from_s3(file_name):
 
     import polars as pl
 
-    # Get S3 client
-    s3 = get_boto_client()
-
-    # Determine file extension (case-insensitive)
-    file_extension = os.path.splitext(file_name.lower())[1]
-
-    # Define Parquet filename based on original file extension
-    if file_extension != ".parquet":
-        base_filename = os.path.splitext(file_name)[0]
-        parquet_filename = f"{base_filename}.parquet"
-    else:
-        parquet_filename = file_name
+    storage = get_storage_backend()
 
     # Define S3 path
-    s3_path = f"datasets/{parquet_filename}"
+    s3_path = get_dataset_s3_path(file_name)
+    parquet_filename = os.path.basename(s3_path)
 
     try:
-        # Download the file into memory
-        file_content = BytesIO()
-        s3.download_fileobj(settings.AWS_BUCKET, s3_path, file_content)
-        file_content.seek(0)
+        cache = get_parquet_cache()
+        local_path = storage.local_path(s3_path)
+        if local_path is not None:
+            # Already on local disk, no copy needed
+            file_content = local_path
+        elif cache is not None:
+            # Content-addressed objects never change; others are checked with a HEAD request
+            etag = version or storage.get_version(s3_path)
+            file_content = cache.get(s3_path, etag)
+            if file_content is None:
+                file_content = cache.put(s3_path, etag, lambda fh: storage.download(s3_path, fh))
+        else:
+            # Download the file into memory
+            file_content = BytesIO()
+            storage.download(s3_path, file_content)
+            file_content.seek(0)
 
-        # Read the Parquet file into a Polars DataFrame first to check schema
+        # Date columns were typed at ingest, so the read path is a pure lazy scan
         print(f"Reading file {parquet_filename} from S3")
-        df = pl.read_parquet(file_content)
-
-        # Print schema for debugging
-        print(f"File schema: {df.schema}")
-
-        # Check for string columns that might be dates
-        string_cols = [col for col, dtype in df.schema.items() if dtype == pl.Utf8]
-        if string_cols:
-            print(f"Found string columns that might be dates: {string_cols}")
-            # Convert to DataFrame, process date columns, then back to LazyFrame
-            df = detect_and_convert_date_columns(df)
-            print(f"Schema after date detection: {df.schema}")
-            return df.lazy()
-        else:
-            # If no string columns to check, just return the LazyFrame
-            file_content.seek(0)  # Reset buffer position
-            return pl.scan_parquet(file_content)
+        return pl.scan_parquet(file_content)
     except Exception as e:
         print(f"Error retrieving file from S3: {str(e)}")
         raise ValueError(f"Failed to retrieve file {file_name} from S3: {str(e)}")
@@ -1,3 +1,4 @@
+import threading
 import time
 from io import BytesIO
 
@@ -9,16 +10,35 @@ from b2sdk.v2 import B2Api, InMemoryAccountInfo
 
 from django.conf import settings
 
+from utils.csv_dialect import csv_read_options, sniff_csv_dialect
+
 KEY_ID = settings.__getattr__("BACKBLAZE_KEY_ID")
 KEY_APPLICATION_KEY = settings.__getattr__("BACKBLAZE_APP_KEY")
 BUCKET_NAME = settings.__getattr__("BACKBLAZE_BUCKET")
 
-# Initialize B2 API
-info = InMemoryAccountInfo()
-b2_api = B2Api(info)
+_b2_api = None
+_b2_api_lock = threading.Lock()
+
 
-# Authenticate
-b2_api.authorize_account("production", KEY_ID, KEY_APPLICATION_KEY)
+def get_b2_api():
+    """
+    Get the process-wide B2 API, authorizing the account on first use.
+
+    Authorizing is a network round trip, so it is deferred until B2 is actually used
+    instead of running whenever this module is imported.
+
+    Returns:
+        B2Api: The authorized B2 API
+    """
+    global _b2_api
+
+    if _b2_api is None:
+        with _b2_api_lock:
+            if _b2_api is None:
+                b2_api = B2Api(InMemoryAccountInfo())
+                b2_api.authorize_account("production", KEY_ID, KEY_APPLICATION_KEY)
+                _b2_api = b2_api
+    return _b2_api
 
 # def upload_file_to_b2(file_path, filename, valid_duration=3600):
 #     """
@@ -135,24 +155,13 @@ def upload_file_to_b2(file_path, filename, valid_duration=3600, extract_metadata
             print(f"Error reading Excel file: {str(e)}")
             raise
     elif file_extension == ".csv":
-        # Read CSV file using Polars
+        # Read CSV file using Polars, in a single parse driven by the detected dialect
+        dialect = sniff_csv_dialect(file_path)
         try:
-            # Try to infer delimiter and other parameters
-            df = pl.read_csv(file_path, infer_schema_length=10000)
+            df = pl.read_csv(file_path, infer_schema_length=10000, **csv_read_options(dialect))
         except Exception as e:
             print(f"Error reading CSV file: {str(e)}")
-            # Fallback to common delimiters if inference fails
-            try:
-                df = pl.read_csv(file_path, separator=",")
-            except:
-                try:
-                    df = pl.read_csv(file_path, separator=";")
-                except:
-                    try:
-                        df = pl.read_csv(file_path, separator="\t")
-                    except Exception as e2:
-                        print(f"Failed to read CSV with common delimiters: {str(e2)}")
-                        raise
+            raise
     else:
         raise ValueError(f"Unsupported file type: {file_extension}. Only .csv, .xlsx, and .xls are supported.")
 
@@ -160,6 +169,8 @@ def upload_file_to_b2(file_path, filename, valid_duration=3600, extract_metadata
     metadata = None
     if extract_metadata:
         metadata = extract_dataset_metadata(df)
+        if file_extension == ".csv":
+            metadata["csv_dialect"] = dialect
 
     # Convert to Parquet with Snappy compression (optimized for speed & size)
     parquet_buffer = BytesIO()
@@ -167,7 +178,7 @@ def upload_file_to_b2(file_path, filename, valid_duration=3600, extract_metadata
     parquet_buffer.seek(0)  # Reset buffer position
 
     # Get bucket info
-    bucket = b2_api.get_bucket_by_name(BUCKET_NAME)
+    bucket = get_b2_api().get_bucket_by_name(BUCKET_NAME)
 
     # Define new Parquet filename (preserve original name but change extension)
     base_filename = os.path.splitext(filename)[0]
@@ -216,7 +227,7 @@ def get_file_from_backblaze(file_name):
     """
     import os
 
-    bucket = b2_api.get_bucket_by_name(BUCKET_NAME)
+    bucket = get_b2_api().get_bucket_by_name(BUCKET_NAME)
 
     # Determine file extension (case-insensitive)
     file_extension = os.path.splitext(file_name.lower())[1]
@@ -0,0 +1,189 @@
+from typing import Dict, List, Optional, Union
+
+import polars as pl
+
+from django.conf import settings
+
+# A string column is only encoded if it has at most this many distinct values per non-null value
+CATEGORICAL_MAX_UNIQUE_RATIO = 0.5
+
+STRING_DTYPES = (pl.Utf8, pl.Categorical, pl.Enum)
+
+# Integer types columns may be narrowed to, in order of preference, with their value ranges. Only
+# types that Polars widens to Int64 when summing are used, so aggregations cannot overflow, and only
+# signed ones, so subtracting values like years or quantities cannot wrap around below zero
+INTEGER_DOWNCAST_TYPES = [
+    (pl.Int8, -(2**7), 2**7 - 1),
+    (pl.Int16, -(2**15), 2**15 - 1),
+]
+WIDE_INTEGER_DTYPES = (pl.Int32, pl.Int64, pl.UInt32, pl.UInt64)
+
+
+def is_string_dtype(dtype: pl.DataType) -> bool:
+    """
+    Check whether a data type holds strings, either plain or dictionary-encoded.
+
+    Args:
+        dtype (pl.DataType): The Polars data type
+
+    Returns:
+        bool: Whether the type is String, Categorical or Enum
+    """
+    return dtype in STRING_DTYPES
+
+
+def choose_categorical_columns(df: pl.DataFrame) -> List[str]:
+    """
+    Choose the string columns of a dataset that are worth storing dictionary-encoded.
+
+    A column qualifies when it has at most CATEGORICAL_MAX_UNIQUE distinct values and
+    repeats them, like a region or a gender. Such columns are stored as Categorical:
+    every value becomes a small integer code into a dictionary, which shrinks memory
+    and makes group-by and is_in hash integers instead of strings.
+
+    When given a sample of a larger file, the choice is based on the sample only.
+
+    Args:
+        df (pl.DataFrame): The dataset, or a sample of it, after date conversion
+
+    Returns:
+        List[str]: The columns to encode
+    """
+    max_unique = settings.CATEGORICAL_MAX_UNIQUE
+    string_columns = [col for col, dtype in df.schema.items() if dtype == pl.Utf8]
+    if max_unique <= 0 or not string_columns or df.height == 0:
+        return []
+
+    # Count distinct and non-null values of every string column in one pass
+    counts = df.select(
+        [pl.col(col).drop_nulls().n_unique().alias(f"{col}_unique") for col in string_columns]
+        + [pl.col(col).count().alias(f"{col}_count") for col in string_columns]
+    )
+
+    columns = []
+    for col in string_columns:
+        unique = counts[0, f"{col}_unique"]
+        count = counts[0, f"{col}_count"]
+        if 0 < unique <= max_unique and unique <= count * CATEGORICAL_MAX_UNIQUE_RATIO:
+            columns.append(col)
+    return columns
+
+
+def choose_numeric_downcasts(df: Union[pl.DataFrame, pl.LazyFrame]) -> Dict[str, pl.DataType]:
+    """
+    Choose the narrowest safe type for each integer column of a dataset.
+
+    Integer columns are narrowed to the smallest signed 8- or 16-bit type that holds
+    their observed min and max, e.g. Int8 for quarters and Int16 for years. Float
+    columns are left as they are: Polars sums Float32 in 32 bits, so narrowing them
+    would lose precision in aggregations even when every stored value is exact.
+
+    The whole dataset is profiled, with the streaming engine for a LazyFrame, since a
+    type chosen from a sample could overflow on the remaining rows.
+
+    Args:
+        df (Union[pl.DataFrame, pl.LazyFrame]): The dataset, after date conversion
+
+    Returns:
+        Dict[str, pl.DataType]: The new type of each column that can be narrowed
+    """
+    schema = df.collect_schema()
+    integer_columns = [col for col, dtype in schema.items() if dtype in WIDE_INTEGER_DTYPES]
+    if not integer_columns:
+        return {}
+
+    # Profile every integer column in one pass
+    exprs = []
+    for col in integer_columns:
+        exprs.extend([pl.col(col).min().alias(f"{col}_min"), pl.col(col).max().alias(f"{col}_max")])
+    if isinstance(df, pl.LazyFrame):
+        profile = df.select(exprs).collect(engine="streaming")
+    else:
+        profile = df.select(exprs)
+
+    downcasts = {}
+    for col in integer_columns:
+        col_min, col_max = profile[0, f"{col}_min"], profile[0, f"{col}_max"]
+        if col_min is None:
+            continue
+        dtype = next((dtype for dtype, low, high in INTEGER_DOWNCAST_TYPES if low <= col_min and col_max <= high), None)
+        if dtype is not None:
+            downcasts[col] = dtype
+    return downcasts
+
+
+def choose_column_casts(
+    sample_df: pl.DataFrame, lf: Optional[pl.LazyFrame] = None, downcast_numeric: bool = True
+) -> Dict[str, pl.DataType]:
+    """
+    Choose the compact types a dataset is stored with.
+
+    Args:
+        sample_df (pl.DataFrame): The dataset, or a sample of it, used to choose categorical columns
+        lf (pl.LazyFrame, optional): The whole dataset when sample_df is only a sample, used to
+            choose numeric types
+        downcast_numeric (bool): Whether to narrow numeric columns
+
+    Returns:
+        Dict[str, pl.DataType]: The new type of each column, see cast_columns
+    """
+    casts = {col: pl.Categorical for col in choose_categorical_columns(sample_df)}
+    if downcast_numeric:
+        casts.update(choose_numeric_downcasts(lf if lf is not None else sample_df))
+    if casts:
+        print(f"Storing columns with compact types: {', '.join(f'{col} as {dtype}' for col, dtype in casts.items())}")
+    return casts
+
+
+def cast_columns(
+    df: Union[pl.DataFrame, pl.LazyFrame], casts: Dict[str, pl.DataType]
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Cast the columns of a dataset to the types chosen by choose_column_casts.
+
+    Args:
+        df (Union[pl.DataFrame, pl.LazyFrame]): The data to write
+        casts (Dict[str, pl.DataType]): The new type of each column
+
+    Returns:
+        Union[pl.DataFrame, pl.LazyFrame]: The data with the columns cast
+    """
+    if not casts:
+        return df
+    return df.with_columns([pl.col(col).cast(dtype) for col, dtype in casts.items()])
+
+
+def cast_schema(schema: Dict[str, pl.DataType], casts: Dict[str, pl.DataType]) -> Dict[str, pl.DataType]:
+    """
+    Get the schema a dataset will have once its columns are cast.
+
+    Args:
+        schema (Dict[str, pl.DataType]): The schema before casting
+        casts (Dict[str, pl.DataType]): The new type of each column
+
+    Returns:
+        Dict[str, pl.DataType]: The schema after casting
+    """
+    return {col: casts.get(col, dtype) for col, dtype in schema.items()}
+
+
+def get_column_dictionaries(df: Union[pl.DataFrame, pl.LazyFrame]) -> Dict[str, List[str]]:
+    """
+    Get the sorted dictionary of every Categorical or Enum column of a dataset.
+
+    Args:
+        df (Union[pl.DataFrame, pl.LazyFrame]): The stored dataset
+
+    Returns:
+        Dict[str, List[str]]: The distinct non-null values of each encoded column
+    """
+    lf = df.lazy() if isinstance(df, pl.DataFrame) else df
+    columns = [col for col, dtype in lf.collect_schema().items() if dtype in (pl.Categorical, pl.Enum)]
+    if not columns:
+        return {}
+
+    # Distinct values are computed on the codes, so only the dictionaries are cast back to strings
+    dictionaries = lf.select(
+        [pl.col(col).drop_nulls().unique().cast(pl.Utf8).sort().implode() for col in columns]
+    ).collect()
+    return {col: dictionaries[0, col].to_list() for col in columns}
@@ -0,0 +1,192 @@
+import codecs
+import csv
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+# Delimiters we are willing to detect, in order of preference on ties
+CANDIDATE_DELIMITERS = [",", ";", "\t", "|"]
+
+# A number or date, which would not appear in a header row
+VALUE_PATTERN = re.compile(r"^-?[\d.,]+%?$|^\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}")
+
+# A number written with a decimal comma, e.g. "12,5" or "-1.234,56"
+DECIMAL_COMMA_PATTERN = re.compile(r"^-?\d{1,3}(\.\d{3})*,\d+$|^-?\d+,\d+$")
+
+
+def _detect_encoding(raw: bytes) -> str:
+    """
+    Detect the text encoding of a sample of bytes.
+
+    Args:
+        raw (bytes): The first bytes of the file
+
+    Returns:
+        str: 'utf8', 'cp1252' or 'latin-1'
+    """
+    try:
+        raw.decode("utf-8")
+        return "utf8"
+    except UnicodeDecodeError as e:
+        # The sample may end in the middle of a multi-byte character
+        if e.start >= len(raw) - 3:
+            return "utf8"
+
+    try:
+        raw.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def _detect_header(first_row: List[str], body: List[List[str]]) -> bool:
+    """
+    Decide whether the first row of a CSV sample is a header.
+
+    The first row is data only when most of its cells look like numbers or dates and
+    none of them is text above a column whose other cells are values, so a header
+    with a few numeric names such as years is still recognised.
+
+    Args:
+        first_row (List[str]): The candidate header row
+        body (List[List[str]]): The rows below it
+
+    Returns:
+        bool: Whether the first row is a header
+    """
+    cells = [value.strip() for value in first_row]
+    filled = [value for value in cells if value]
+    if not filled:
+        return True
+    if sum(1 for value in filled if VALUE_PATTERN.match(value)) * 2 <= len(filled):
+        return True
+
+    for i, value in enumerate(cells):
+        column = [row[i].strip() for row in body if i < len(row) and row[i].strip()]
+        column_holds_values = column and sum(1 for v in column if VALUE_PATTERN.match(v)) * 2 > len(column)
+        if value and column_holds_values and not VALUE_PATTERN.match(value):
+            return True
+    return False
+
+
+def sniff_csv_dialect(file_path: str, sample_bytes: int = 64 * 1024) -> Dict[str, Any]:
+    """
+    Detect the dialect of a CSV file from its first few KB.
+
+    Detects the delimiter, quote character, text encoding, header row and decimal
+    separator, so the file can then be parsed exactly once.
+
+    Args:
+        file_path (str): The local path to the CSV file
+        sample_bytes (int, optional): Number of bytes to inspect
+
+    Returns:
+        Dict[str, Any]: The detected dialect, suitable for storing in dataset metadata
+    """
+    with open(file_path, "rb") as f:
+        raw = f.read(sample_bytes)
+
+    has_bom = raw.startswith(b"\xef\xbb\xbf")
+    if has_bom:
+        raw = raw[3:]
+
+    encoding = _detect_encoding(raw)
+    text = raw.decode("utf-8" if encoding == "utf8" else encoding, errors="replace")
+
+    # Drop the last line, which is probably cut off by the sample boundary
+    raw_lines = text.splitlines()
+    if len(raw) == sample_bytes and len(raw_lines) > 1:
+        raw_lines = raw_lines[:-1]
+
+    # Keep the original line numbers so preamble rows can be skipped by the reader
+    numbered_lines = [(i, line) for i, line in enumerate(raw_lines) if line.strip()]
+    lines = [line for _, line in numbered_lines]
+    sample = "\n".join(lines)
+
+    dialect = {
+        "separator": ",",
+        "quote_char": '"',
+        "encoding": encoding,
+        "has_header": True,
+        "skip_rows": 0,
+        "decimal_comma": False,
+    }
+
+    if not lines:
+        return dialect
+
+    sniffer = csv.Sniffer()
+    try:
+        sniffed = sniffer.sniff(sample, delimiters="".join(CANDIDATE_DELIMITERS))
+        dialect["separator"] = sniffed.delimiter
+        dialect["quote_char"] = sniffed.quotechar or '"'
+    except csv.Error:
+        # Fall back to the candidate that splits lines most consistently
+        counts = {d: Counter(line.count(d) for line in lines).most_common(1)[0] for d in CANDIDATE_DELIMITERS}
+        dialect["separator"] = max(CANDIDATE_DELIMITERS, key=lambda d: (counts[d][0] > 0, counts[d][1], counts[d][0]))
+
+    separator = dialect["separator"]
+    rows = list(csv.reader(lines, delimiter=separator, quotechar=dialect["quote_char"]))
+
+    # The header is the first row with the typical field count; anything above it is a preamble
+    modal_width = Counter(len(row) for row in rows).most_common(1)[0][0]
+    header_index = next((i for i, row in enumerate(rows) if len(row) == modal_width), 0)
+    dialect["skip_rows"] = numbered_lines[header_index][0]
+
+    dialect["has_header"] = _detect_header(rows[header_index], rows[header_index + 1 :])
+
+    # A decimal comma is only possible when the comma is not the delimiter
+    if separator != ",":
+        body = rows[header_index + 1 :] if dialect["has_header"] else rows[header_index:]
+        values = [value.strip() for row in body for value in row if value.strip()]
+        decimal_comma_count = sum(1 for value in values if DECIMAL_COMMA_PATTERN.match(value))
+        decimal_point_count = sum(1 for value in values if re.match(r"^-?\d+\.\d+$", value))
+        dialect["decimal_comma"] = decimal_comma_count > 0 and decimal_comma_count >= decimal_point_count
+
+    return dialect
+
+
+def csv_read_options(dialect: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Translate a detected dialect into keyword arguments for pl.read_csv / pl.scan_csv.
+
+    pl.scan_csv only reads UTF-8, so a file in another encoding must be converted with
+    transcode_to_utf8 before it is scanned.
+
+    Args:
+        dialect (Dict[str, Any]): The dialect returned by sniff_csv_dialect
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for the Polars CSV reader
+    """
+    options = {
+        "separator": dialect.get("separator", ","),
+        "quote_char": dialect.get("quote_char", '"'),
+        "has_header": dialect.get("has_header", True),
+        "skip_rows": dialect.get("skip_rows", 0),
+        "encoding": dialect.get("encoding", "utf8"),
+    }
+    if dialect.get("decimal_comma"):
+        options["decimal_comma"] = True
+    return options
+
+
+def transcode_to_utf8(file_path: str, encoding: str, output_path: str, chunk_size: int = 1024 * 1024) -> None:
+    """
+    Convert a text file to UTF-8 in chunks, so it can be scanned by the streaming engine
+    without replacing its characters.
+
+    Args:
+        file_path (str): The local path to the file
+        encoding (str): The encoding detected by sniff_csv_dialect, e.g. 'cp1252'
+        output_path (str): The local path to write the UTF-8 copy to
+        chunk_size (int, optional): Number of bytes converted at a time
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with open(file_path, "rb") as src, open(output_path, "w", encoding="utf-8", newline="") as dst:
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            dst.write(decoder.decode(chunk))
+        dst.write(decoder.decode(b"", final=True))
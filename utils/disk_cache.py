@@ -0,0 +1,119 @@
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class DiskLRUCache:
+    """
+    Base class for local on-disk caches bounded by a byte budget.
+
+    Entries are files with a common suffix in a single directory, which can be shared
+    by several worker processes. The modification time of a file is its last access,
+    so the least recently used files are evicted first. Hit/miss counters are kept
+    per process.
+    """
+
+    suffix = ""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _lookup(self, path: str) -> Optional[str]:
+        try:
+            # Refresh the access time so LRU eviction keeps hot entries
+            os.utime(path, None)
+        except FileNotFoundError:
+            # Missing, or evicted by another process
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def _write_entry(self, path: str, write: Callable[[str], None]) -> str:
+        # Write to a temporary file first so readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        os.close(fd)
+        try:
+            write(temp_path)
+            os.replace(temp_path, path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return path
+
+    def _remove_entries(self, prefix: str, keep: Optional[str] = None) -> None:
+        # Removing a file that another process has open or mapped is safe: its data stays valid until closed
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(prefix) and name.endswith(self.suffix) and path != keep:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _list_entries(self) -> list:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits its byte budget.
+        """
+        entries = self._list_entries()
+        total_bytes = sum(size for _, size, _ in entries)
+        if total_bytes <= self.max_bytes:
+            return
+
+        # Oldest access first
+        entries.sort()
+        for _, size, path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total_bytes -= size
+                with self._lock:
+                    self.evictions += 1
+            except FileNotFoundError:
+                continue
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and the current size of the cache.
+
+        Returns:
+            Dict[str, Any]: Cache statistics
+        """
+        entries = self._list_entries()
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "entries": len(entries),
+                "size_bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+            }
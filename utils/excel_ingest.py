@@ -0,0 +1,131 @@
+import csv
+import datetime
+from typing import List, Optional
+
+import polars as pl
+
+from django.conf import settings
+
+# Excel engines in order of preference; "calamine" is Rust-based and needs the fastexcel package
+EXCEL_ENGINES = ["calamine", "openpyxl"]
+
+# Dialect of the CSV files written by write_excel_sheet_csv
+EXCEL_CSV_DIALECT = {"separator": ",", "quote_char": '"', "has_header": True, "skip_rows": 0, "encoding": "utf8"}
+
+
+def calamine_available() -> bool:
+    """
+    Check whether the calamine Excel engine can be used.
+
+    Returns:
+        bool: Whether the fastexcel package is installed
+    """
+    try:
+        import fastexcel  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_excel_engine() -> str:
+    """
+    Get the Excel engine selected by the EXCEL_ENGINE setting.
+
+    Falls back to openpyxl when calamine is selected but fastexcel is not installed.
+    Note that openpyxl only reads .xlsx files, while calamine also reads legacy .xls.
+
+    Returns:
+        str: "calamine" or "openpyxl"
+    """
+    engine = settings.EXCEL_ENGINE.lower()
+    if engine not in EXCEL_ENGINES:
+        raise ValueError(f"Unsupported Excel engine: {settings.EXCEL_ENGINE}. Supported: {', '.join(EXCEL_ENGINES)}")
+
+    if engine == "calamine" and not calamine_available():
+        print("fastexcel is not installed, falling back to the openpyxl Excel engine")
+        engine = "openpyxl"
+    return engine
+
+
+def list_excel_sheets(file_path: str, engine: Optional[str] = None) -> List[str]:
+    """
+    List the sheets of a workbook without reading their cells.
+
+    Args:
+        file_path (str): The local path to the workbook
+        engine (str, optional): The Excel engine. Defaults to get_excel_engine()
+
+    Returns:
+        List[str]: Sheet names in workbook order
+    """
+    engine = engine or get_excel_engine()
+    if engine == "calamine":
+        import fastexcel
+
+        return fastexcel.read_excel(file_path).sheet_names
+
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+def read_excel_sheet(file_path: str, sheet_name: Optional[str] = None, engine: Optional[str] = None) -> pl.DataFrame:
+    """
+    Read one sheet of a workbook into a DataFrame.
+
+    Args:
+        file_path (str): The local path to the workbook
+        sheet_name (str, optional): The sheet to read. Defaults to the first sheet
+        engine (str, optional): The Excel engine. Defaults to get_excel_engine()
+
+    Returns:
+        pl.DataFrame: The sheet's data
+    """
+    engine = engine or get_excel_engine()
+    if sheet_name is None:
+        return pl.read_excel(file_path, sheet_id=1, engine=engine)
+    return pl.read_excel(file_path, sheet_name=sheet_name, engine=engine)
+
+
+def _format_cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime.datetime):
+        # Matches the date patterns recognized by detect_and_convert_date_columns
+        return value.isoformat(sep=" ")
+    return str(value)
+
+
+def write_excel_sheet_csv(file_path: str, csv_path: str, sheet_name: Optional[str] = None) -> None:
+    """
+    Write one sheet of an .xlsx workbook to a CSV file with bounded memory.
+
+    The sheet is read row by row with openpyxl in read-only mode, so memory use does
+    not grow with the size of the sheet. The CSV is then converted to Parquet with the
+    streaming CSV engine, using EXCEL_CSV_DIALECT.
+
+    Args:
+        file_path (str): The local path to the .xlsx workbook
+        csv_path (str): The local path to write the CSV file to
+        sheet_name (str, optional): The sheet to write. Defaults to the first sheet
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name is not None else workbook.worksheets[0]
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            for row in worksheet.iter_rows(values_only=True):
+                # Skip blank rows, which read-only mode reports up to the sheet's stated dimension
+                if all(value is None for value in row):
+                    continue
+                writer.writerow([_format_cell(value) for value in row])
+    finally:
+        workbook.close()
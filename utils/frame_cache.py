@@ -0,0 +1,312 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import polars as pl
+
+from django.conf import settings
+
+from utils.aws_config import get_file_from_s3, scan_parquet_from_s3
+from utils.hot_tier import get_hot_tier
+from utils.partitioned_storage import scan_partitioned_dataset
+
+
+class DataFrameCache:
+    """
+    In-process LRU cache of decoded, ready-to-query Polars DataFrames.
+
+    Entries are keyed by dataset id and version, where the version is the content
+    hash of the dataset's stored object (see get_dataset_version). Re-processing a
+    dataset with new data changes its version, so other worker processes stop hitting
+    the old entry even without receiving the signal that invalidates it locally. The
+    cache is bounded by the estimated in-memory size of the frames it holds.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[pl.DataFrame, int]]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, dataset_id: str, version: str) -> Optional[pl.DataFrame]:
+        """
+        Look up a cached DataFrame.
+
+        Args:
+            dataset_id (str): UUID of the dataset
+            version (str): Version of the dataset
+
+        Returns:
+            Optional[pl.DataFrame]: The cached DataFrame, or None on a miss
+        """
+        key = (dataset_id, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, dataset_id: str, version: str, df: pl.DataFrame) -> None:
+        """
+        Add a DataFrame to the cache, evicting least recently used entries as needed.
+
+        Args:
+            dataset_id (str): UUID of the dataset
+            version (str): Version of the dataset
+            df (pl.DataFrame): The decoded DataFrame
+        """
+        size = df.estimated_size()
+        if size > self.max_bytes:
+            print(f"DataFrame for dataset {dataset_id} ({size} bytes) exceeds the cache budget, not caching")
+            return
+
+        with self._lock:
+            # Older versions of the same dataset can never be hit again
+            self._remove_dataset(dataset_id)
+            self._entries[(dataset_id, version)] = (df, size)
+            self._size_bytes += size
+
+            while self._size_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size_bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, dataset_id: str) -> None:
+        """
+        Drop all cached versions of a dataset.
+
+        Args:
+            dataset_id (str): UUID of the dataset
+        """
+        with self._lock:
+            self._remove_dataset(dataset_id)
+
+    def _remove_dataset(self, dataset_id: str) -> None:
+        for key in [key for key in self._entries if key[0] == dataset_id]:
+            _, size = self._entries.pop(key)
+            self._size_bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and the current size of the cache.
+
+        Returns:
+            Dict[str, Any]: Cache statistics
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_frame_cache = None
+_frame_cache_lock = threading.Lock()
+
+
+def get_frame_cache() -> Optional[DataFrameCache]:
+    """
+    Get the process-wide DataFrame cache.
+
+    Returns:
+        Optional[DataFrameCache]: The cache, or None if caching is disabled
+    """
+    global _frame_cache
+
+    if settings.DATAFRAME_CACHE_MAX_BYTES <= 0:
+        return None
+
+    if _frame_cache is None:
+        with _frame_cache_lock:
+            if _frame_cache is None:
+                _frame_cache = DataFrameCache(settings.DATAFRAME_CACHE_MAX_BYTES)
+    return _frame_cache
+
+
+def get_frame_cache_stats() -> Dict[str, Any]:
+    """
+    Get statistics for the DataFrame cache.
+
+    Returns:
+        Dict[str, Any]: Cache statistics, or {"enabled": False} if caching is disabled
+    """
+    cache = get_frame_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+def get_dataset_version(dataset) -> str:
+    """
+    Get the cache version of a dataset.
+
+    Content-addressed datasets are versioned by their content hash, which only changes
+    when the stored data does. Older datasets fall back to their modification time.
+
+    Args:
+        dataset (Dataset): The dataset
+
+    Returns:
+        str: The version string
+    """
+    content_hash = (dataset.metadata or {}).get("file_info", {}).get("content_hash")
+    if content_hash:
+        return content_hash
+    return dataset.modified_date.isoformat() if dataset.modified_date else ""
+
+
+def get_partition_info(dataset) -> Optional[Dict[str, Any]]:
+    """
+    Get the file info of a dataset stored as a partitioned directory.
+
+    Args:
+        dataset (Dataset): The dataset
+
+    Returns:
+        Optional[Dict[str, Any]]: The file info with its partitions, or None for single-file datasets
+    """
+    file_info = (dataset.metadata or {}).get("file_info", {})
+    if file_info.get("layout") == "hive" and file_info.get("partitions"):
+        return file_info
+    return None
+
+
+def _load_dataset(dataset, file_name: str) -> pl.DataFrame:
+    dataset_id = str(dataset.object_id)
+    version = get_dataset_version(dataset)
+
+    hot_tier = get_hot_tier()
+    if hot_tier is not None:
+        path = hot_tier.get(dataset_id, version)
+        if path is not None:
+            # Zero-copy: the buffers are backed by the shared page cache, nothing is decoded
+            return pl.read_ipc(path, memory_map=True, rechunk=False)
+
+    file_info = get_partition_info(dataset)
+    if file_info is not None:
+        df = scan_partitioned_dataset(file_info).collect()
+    else:
+        # Content-addressed objects are immutable, so the disk cache needs no freshness check
+        content_hash = (dataset.metadata or {}).get("file_info", {}).get("content_hash")
+        df = get_file_from_s3(file_name, version=content_hash).collect()
+
+    if hot_tier is not None and hot_tier.record_access(dataset_id, version):
+        try:
+            hot_tier.promote(dataset_id, version, df)
+        except Exception as e:
+            print(f"Failed to promote dataset {dataset_id} to the Arrow hot tier: {str(e)}")
+    return df
+
+
+def get_dataset_frame(dataset, file_name: str) -> pl.DataFrame:
+    """
+    Get the decoded DataFrame for a dataset, using the in-process cache when possible.
+
+    Args:
+        dataset (Dataset): The dataset to load
+        file_name (str): The name of the dataset's Parquet file
+
+    Returns:
+        pl.DataFrame: The decoded DataFrame
+    """
+    cache = get_frame_cache()
+    if cache is None:
+        return _load_dataset(dataset, file_name)
+
+    dataset_id = str(dataset.object_id)
+    version = get_dataset_version(dataset)
+
+    df = cache.get(dataset_id, version)
+    if df is None:
+        df = _load_dataset(dataset, file_name)
+        cache.put(dataset_id, version, df)
+    return df
+
+
+def scan_dataset(dataset, file_name: str, start=None, end=None) -> pl.LazyFrame:
+    """
+    Get a LazyFrame for a dataset from the cheapest available source.
+
+    Small datasets are decoded once and served from the in-process cache. Large
+    datasets that are not already cached are read from their memory-mapped Arrow
+    hot copy if they have one, and otherwise scanned remotely, so that column
+    projection and filters applied to the returned LazyFrame reach the network.
+    Remote scans count towards promotion to the hot tier, and a dataset that is due
+    is streamed into it in the background.
+    For partitioned datasets only the partitions overlapping the time range are
+    scanned; callers still filter rows by the range themselves.
+
+    Args:
+        dataset (Dataset): The dataset to load
+        file_name (str): The name of the dataset's Parquet file
+        start (Union[str, date, datetime], optional): Inclusive start of the time range of interest
+        end (Union[str, date, datetime], optional): Inclusive end of the time range of interest
+
+    Returns:
+        pl.LazyFrame: A LazyFrame over the dataset
+    """
+    dataset_info = (dataset.metadata or {}).get("dataset_info", {})
+    if dataset_info.get("estimated_memory_bytes", 0) < settings.S3_RANGE_READ_MIN_BYTES:
+        return get_dataset_frame(dataset, file_name).lazy()
+
+    cache = get_frame_cache()
+    if cache is not None:
+        df = cache.get(str(dataset.object_id), get_dataset_version(dataset))
+        if df is not None:
+            return df.lazy()
+
+    dataset_id = str(dataset.object_id)
+    version = get_dataset_version(dataset)
+    hot_tier = get_hot_tier()
+    if hot_tier is not None:
+        path = hot_tier.get(dataset_id, version)
+        if path is not None:
+            return pl.scan_ipc(path, memory_map=True)
+
+    file_info = get_partition_info(dataset)
+    if hot_tier is not None and hot_tier.record_access(dataset_id, version):
+        full_scan = scan_partitioned_dataset(file_info) if file_info is not None else scan_parquet_from_s3(file_name)
+        threading.Thread(
+            target=_promote_scan,
+            args=(hot_tier, dataset_id, version, full_scan, dataset_info.get("estimated_memory_bytes")),
+            daemon=True,
+        ).start()
+
+    if file_info is not None:
+        return scan_partitioned_dataset(file_info, start, end)
+    return scan_parquet_from_s3(file_name)
+
+
+def _promote_scan(hot_tier, dataset_id: str, version: str, lf: pl.LazyFrame, estimated_bytes: Optional[int]) -> None:
+    try:
+        hot_tier.promote(dataset_id, version, lf, estimated_bytes=estimated_bytes)
+    except Exception as e:
+        print(f"Failed to promote dataset {dataset_id} to the Arrow hot tier: {str(e)}")
+
+
+def invalidate_dataset_frame(dataset_id) -> None:
+    """
+    Drop all cached DataFrames and hot copies of a dataset.
+
+    Args:
+        dataset_id (Union[str, UUID]): UUID of the dataset
+    """
+    cache = get_frame_cache()
+    if cache is not None:
+        cache.invalidate(str(dataset_id))
+
+    hot_tier = get_hot_tier()
+    if hot_tier is not None:
+        hot_tier.invalidate(str(dataset_id))
@@ -1,4 +1,8 @@
+import os
+import tempfile
+
 import polars as pl
+import requests
 
 
 def detect_datetime_columns(df: pl.DataFrame) -> list:
@@ -32,22 +36,35 @@ def detect_datetime_columns(df: pl.DataFrame) -> list:
     return datetime_columns
 
 
-from io import StringIO
-
-import polars as pl
-import requests
+def load_data(url: str) -> pl.DataFrame:
+    """
+    Loads newline-delimited JSON from a URL into a Polars DataFrame.
 
+    The response is streamed to a temporary file instead of being decoded in memory,
+    then read by Polars' NDJSON reader. Responses compressed as .gz, .zst or .zip
+    (detected from the URL) are expanded first.
 
-def load_data(url: str) -> pl.DataFrame:
+    Args:
+        url (str): The URL of the NDJSON data.
 
-    # Stream the response directly
-    response = requests.get("https://api.example.com/large-data", stream=True)
+    Returns:
+        pl.DataFrame: The data.
+    """
+    from utils.ingest_formats import decompress_upload
 
-    # Create a file-like object from the stream
-    stream = StringIO()
-    for chunk in response.iter_content(chunk_size=8192):
-        stream.write(chunk.decode("utf-8"))
-    stream.seek(0)
+    filename = os.path.basename(url.split("?")[0]) or "data.ndjson"
+    fd, file_path = tempfile.mkstemp(suffix=f"_{filename}")
+    data_path = file_path
+    try:
+        # Stream the response to disk, chunk by chunk
+        with os.fdopen(fd, "wb") as f, requests.get(url, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                f.write(chunk)
 
-    # Read as LazyFrame
-    lazy_df = pl.scan_ndjson(stream)
+        data_path, _ = decompress_upload(file_path, filename)
+        return pl.read_ndjson(data_path)
+    finally:
+        for path in {file_path, data_path}:
+            if os.path.exists(path):
+                os.remove(path)
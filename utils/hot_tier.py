@@ -0,0 +1,187 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+import polars as pl
+
+from django.conf import settings
+
+from utils.disk_cache import DiskLRUCache
+
+# Number of datasets whose loads are counted towards promotion
+MAX_TRACKED_DATASETS = 1024
+
+
+class ArrowHotTier(DiskLRUCache):
+    """
+    Local hot tier of frequently used datasets stored as uncompressed Arrow IPC files.
+
+    IPC files are opened with memory mapping, so reading one costs no decompression
+    or decoding, and all worker processes on a host share the same pages of the OS
+    page cache instead of each holding a private copy. A dataset is promoted once it
+    has been loaded PROMOTE_AFTER times by a process. Entries are keyed by dataset id
+    and version, and the tier is bounded by its own byte budget, evicting the least
+    recently used files first.
+    """
+
+    suffix = ".arrow"
+
+    def __init__(self, cache_dir: str, max_bytes: int, promote_after: int):
+        super().__init__(cache_dir, max_bytes)
+        self.promote_after = promote_after
+        self.promotions = 0
+        self._access_counts: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+
+    def _entry_path(self, dataset_id: str, version: str) -> str:
+        version_hash = hashlib.sha1(version.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{dataset_id}_{version_hash}.arrow")
+
+    def get(self, dataset_id: str, version: str) -> Optional[str]:
+        """
+        Look up the hot copy of a dataset.
+
+        Args:
+            dataset_id (str): UUID of the dataset
+            version (str): Version of the dataset
+
+        Returns:
+            Optional[str]: Local path of the Arrow IPC file, or None on a miss
+        """
+        return self._lookup(self._entry_path(dataset_id, version))
+
+    def record_access(self, dataset_id: str, version: str) -> bool:
+        """
+        Count a load of a dataset that missed the hot tier.
+
+        Only the MAX_TRACKED_DATASETS most recently loaded datasets are counted, so
+        the counts of datasets that are rarely used are forgotten. The count restarts
+        once a dataset is due for promotion, so concurrent loads promote it only once.
+
+        Args:
+            dataset_id (str): UUID of the dataset
+            version (str): Version of the dataset
+
+        Returns:
+            bool: Whether the dataset is now used often enough to be promoted
+        """
+        key = (dataset_id, version)
+        with self._lock:
+            self._access_counts[key] = self._access_counts.get(key, 0) + 1
+            self._access_counts.move_to_end(key)
+            while len(self._access_counts) > MAX_TRACKED_DATASETS:
+                self._access_counts.popitem(last=False)
+            if self._access_counts[key] < self.promote_after:
+                return False
+            del self._access_counts[key]
+            return True
+
+    def promote(
+        self,
+        dataset_id: str,
+        version: str,
+        data: Union[pl.DataFrame, pl.LazyFrame],
+        estimated_bytes: Optional[int] = None,
+    ) -> Optional[str]:
+        """
+        Write a dataset into the hot tier.
+
+        A LazyFrame is written with the streaming engine, so a dataset too large to
+        decode in memory can still be promoted.
+
+        Args:
+            dataset_id (str): UUID of the dataset
+            version (str): Version of the dataset
+            data (Union[pl.DataFrame, pl.LazyFrame]): The decoded dataset, or a scan of it
+            estimated_bytes (int, optional): The decoded size of the dataset. Defaults to the
+                estimated size of a DataFrame
+
+        Returns:
+            Optional[str]: Local path of the Arrow IPC file, or None if it does not fit the budget
+        """
+        if estimated_bytes is None and isinstance(data, pl.DataFrame):
+            estimated_bytes = data.estimated_size()
+        if estimated_bytes is not None and estimated_bytes > self.max_bytes:
+            print(f"Dataset {dataset_id} exceeds the Arrow hot tier budget, not promoting")
+            return None
+
+        def write(temp_path: str) -> None:
+            if isinstance(data, pl.LazyFrame):
+                data.sink_ipc(temp_path, compression=None)
+            else:
+                data.write_ipc(temp_path, compression="uncompressed")
+
+        path = self._write_entry(self._entry_path(dataset_id, version), write)
+
+        with self._lock:
+            self.promotions += 1
+
+        self._remove_entries(f"{dataset_id}_", keep=path)
+        self.evict()
+        print(f"Promoted dataset {dataset_id} to the Arrow hot tier")
+        return path
+
+    def invalidate(self, dataset_id: str) -> None:
+        """
+        Drop the hot copies and access counts of a dataset.
+
+        Args:
+            dataset_id (str): UUID of the dataset
+        """
+        with self._lock:
+            for key in [key for key in self._access_counts if key[0] == dataset_id]:
+                del self._access_counts[key]
+        self._remove_entries(f"{dataset_id}_")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and the current size of the tier.
+
+        Returns:
+            Dict[str, Any]: Tier statistics
+        """
+        stats = super().stats()
+        with self._lock:
+            stats.update(promotions=self.promotions, promote_after=self.promote_after)
+        return stats
+
+
+_hot_tier = None
+_hot_tier_lock = threading.Lock()
+
+
+def get_hot_tier() -> Optional[ArrowHotTier]:
+    """
+    Get the process-wide Arrow hot tier.
+
+    Returns:
+        Optional[ArrowHotTier]: The hot tier, or None if it is disabled
+    """
+    global _hot_tier
+
+    if settings.ARROW_HOT_TIER_MAX_BYTES <= 0:
+        return None
+
+    if _hot_tier is None:
+        with _hot_tier_lock:
+            if _hot_tier is None:
+                _hot_tier = ArrowHotTier(
+                    settings.ARROW_HOT_TIER_DIR,
+                    settings.ARROW_HOT_TIER_MAX_BYTES,
+                    settings.ARROW_HOT_TIER_PROMOTE_AFTER,
+                )
+    return _hot_tier
+
+
+def get_hot_tier_stats() -> Dict[str, Any]:
+    """
+    Get statistics for the Arrow hot tier.
+
+    Returns:
+        Dict[str, Any]: Tier statistics, or {"enabled": False} if the tier is disabled
+    """
+    hot_tier = get_hot_tier()
+    if hot_tier is None:
+        return {"enabled": False}
+    return {"enabled": True, **hot_tier.stats()}
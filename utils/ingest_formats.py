@@ -0,0 +1,138 @@
+import gzip
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import Dict, Optional, Tuple
+
+import polars as pl
+
+# File types that can be converted into datasets
+DATA_EXTENSIONS = [".csv", ".xlsx", ".xls", ".parquet", ".ndjson", ".jsonl"]
+
+# Compressions that are expanded before ingest; .zst needs the zstandard package
+COMPRESSION_EXTENSIONS = [".gz", ".zst", ".zip"]
+
+# Bytes copied at a time while decompressing
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def split_compression_extension(filename: str) -> Tuple[str, Optional[str]]:
+    """
+    Split the compression extension off a filename, e.g. 'sales.csv.gz' -> ('sales.csv', '.gz').
+
+    Args:
+        filename (str): The filename
+
+    Returns:
+        Tuple[str, Optional[str]]: The filename without the compression extension, and the
+            compression extension or None if the file is not compressed
+    """
+    base, extension = os.path.splitext(filename)
+    if extension.lower() in COMPRESSION_EXTENSIONS:
+        return base, extension.lower()
+    return filename, None
+
+
+def get_data_extension(filename: str) -> Optional[str]:
+    """
+    Get the data file type of an upload, looking through a .gz or .zst compression extension.
+
+    Args:
+        filename (str): The filename
+
+    Returns:
+        Optional[str]: The lowercase data extension, or None for .zip archives, whose
+            contents are only known once they are opened
+    """
+    inner_filename, compression = split_compression_extension(filename)
+    if compression == ".zip":
+        return None
+    return os.path.splitext(inner_filename.lower())[1]
+
+
+def _open_zip_member(file_path: str):
+    archive = zipfile.ZipFile(file_path)
+    # Skip directories and the metadata folders added by macOS
+    members = [
+        info
+        for info in archive.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith("__MACOSX/")
+        and not os.path.basename(info.filename).startswith(".")
+        and os.path.splitext(info.filename.lower())[1] in DATA_EXTENSIONS
+    ]
+    if len(members) != 1:
+        archive.close()
+        raise ValueError(f"Zip archives must contain exactly one data file, found {len(members)}")
+    return archive, archive.open(members[0]), os.path.basename(members[0].filename)
+
+
+def decompress_upload(file_path: str, filename: str, dest_dir: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Expand a compressed upload into a temporary file, streaming so memory stays bounded.
+
+    Args:
+        file_path (str): The local path of the upload
+        filename (str): The name of the upload, used to detect the compression
+        dest_dir (str, optional): Directory for the expanded file. Defaults to the upload's directory
+
+    Returns:
+        Tuple[str, str]: The path and filename of the expanded file, or the upload's own path
+            and filename if it is not compressed
+    """
+    inner_filename, compression = split_compression_extension(filename)
+    if compression is None:
+        return file_path, filename
+
+    archive = None
+    if compression == ".gz":
+        source = gzip.open(file_path, "rb")
+    elif compression == ".zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("Reading .zst files requires the zstandard package")
+        source = zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), closefd=True)
+    else:
+        archive, source, inner_filename = _open_zip_member(file_path)
+
+    fd, data_path = tempfile.mkstemp(dir=dest_dir or os.path.dirname(file_path), suffix=f"_{inner_filename}")
+    try:
+        with os.fdopen(fd, "wb") as f, source:
+            shutil.copyfileobj(source, f, COPY_BUFFER_SIZE)
+    except Exception:
+        os.remove(data_path)
+        raise
+    finally:
+        if archive is not None:
+            archive.close()
+
+    print(f"Decompressed {filename} to {inner_filename}")
+    return data_path, inner_filename
+
+
+def validate_parquet_schema(schema: Dict[str, pl.DataType]) -> None:
+    """
+    Check that an uploaded Parquet file has a schema the dashboard can work with.
+
+    Args:
+        schema (Dict[str, pl.DataType]): The schema of the file
+
+    Raises:
+        ValueError: If the file has no columns, unnamed columns, or nested or binary columns
+    """
+    if not schema:
+        raise ValueError("Parquet file has no columns")
+
+    unnamed = [col for col in schema if not col.strip()]
+    if unnamed:
+        raise ValueError("Parquet file has columns without a name")
+
+    unsupported = [
+        f"{col} ({dtype})"
+        for col, dtype in schema.items()
+        if isinstance(dtype, (pl.List, pl.Array, pl.Struct)) or dtype in (pl.Binary, pl.Object, pl.Null)
+    ]
+    if unsupported:
+        raise ValueError(f"Parquet file has unsupported column types: {', '.join(unsupported)}")
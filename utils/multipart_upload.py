@@ -0,0 +1,141 @@
+import base64
+import hashlib
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MB = 1024 * 1024
+
+# S3 rejects non-final parts smaller than 5 MB
+MIN_PART_SIZE = 5 * MB
+
+
+class MultipartUploadWriter(io.RawIOBase):
+    """
+    Writable file object that uploads to S3/Minio as a parallel multipart upload.
+
+    Data is cut into parts as it is written and each full part is sent on a
+    thread pool straight away, so writing (e.g. Parquet encoding) and uploading
+    overlap. Every part carries a Content-MD5 checksum that the server verifies,
+    and a failed part is retried with exponential backoff. At most
+    ``2 * max_workers`` parts are buffered at a time, which bounds memory use.
+
+    Use it as a context manager: the upload is completed on a clean exit and
+    aborted if an exception is raised.
+    """
+
+    def __init__(self, s3, bucket, key, part_size=8 * MB, max_workers=4, max_retries=3):
+        super().__init__()
+        self.s3 = s3
+        self.bucket = bucket
+        self.key = key
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.max_retries = max_retries
+        self.bytes_written = 0
+
+        self._buffer = bytearray()
+        self._part_number = 0
+        self._futures = []
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="s3-part")
+        self._slots = threading.BoundedSemaphore(max_workers * 2)
+        self._completed = False
+
+        response = self.s3.create_multipart_upload(Bucket=self.bucket, Key=self.key)
+        self.upload_id = response["UploadId"]
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("write to closed upload")
+
+        self._buffer.extend(data)
+        self.bytes_written += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._submit_part(bytes(self._buffer[: self.part_size]))
+            del self._buffer[: self.part_size]
+        return len(data)
+
+    def _submit_part(self, data):
+        self._part_number += 1
+        # Block the writer while too many parts are in flight
+        self._slots.acquire()
+        future = self._executor.submit(self._upload_part, self._part_number, data)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def _upload_part(self, part_number, data):
+        checksum = base64.b64encode(hashlib.md5(data).digest()).decode("ascii")  # nosec B324 - integrity check
+
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                response = self.s3.upload_part(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    UploadId=self.upload_id,
+                    PartNumber=part_number,
+                    Body=data,
+                    ContentMD5=checksum,
+                )
+                return {"PartNumber": part_number, "ETag": response["ETag"]}
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                print(f"Retrying part {part_number} of {self.key} after error: {str(e)}")
+                time.sleep(0.5 * 2 ** (attempt - 1))
+
+    def complete(self):
+        """
+        Upload any remaining data and complete the multipart upload.
+
+        Returns:
+            dict: The CompleteMultipartUpload response
+        """
+        # The final part may be smaller than the minimum part size
+        if self._buffer or self._part_number == 0:
+            self._submit_part(bytes(self._buffer))
+            self._buffer.clear()
+
+        parts = [future.result() for future in self._futures]
+        self._executor.shutdown(wait=True)
+
+        response = self.s3.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": sorted(parts, key=lambda part: part["PartNumber"])},
+        )
+        self._completed = True
+        super().close()
+        return response
+
+    def abort(self):
+        """
+        Abort the multipart upload and discard any uploaded parts.
+        """
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+        try:
+            self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+        except Exception as e:
+            print(f"Failed to abort multipart upload of {self.key}: {str(e)}")
+        super().close()
+
+    def close(self):
+        # An upload that was never completed must not leave orphaned parts behind
+        if not self.closed and not self._completed:
+            self.abort()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+            return False
+        try:
+            self.complete()
+        except Exception:
+            self.abort()
+            raise
+        return False
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+
+from utils.disk_cache import DiskLRUCache
+
+
+class ParquetDiskCache(DiskLRUCache):
+    """
+    Local on-disk cache for Parquet objects downloaded from S3/Minio.
+
+    Entries are keyed by the S3 path plus the object's ETag, so a changed object
+    is never served from a stale copy. The cache is bounded by a byte budget and
+    evicts the least recently used files first. The directory can be shared by
+    several worker processes; hit/miss counters are kept per process.
+    """
+
+    suffix = ".parquet"
+
+    @staticmethod
+    def _key_prefix(s3_path: str) -> str:
+        return hashlib.sha1(s3_path.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, s3_path: str, etag: str) -> str:
+        clean_etag = etag.strip('"').replace("/", "_")
+        return os.path.join(self.cache_dir, f"{self._key_prefix(s3_path)}_{clean_etag}.parquet")
+
+    def get(self, s3_path: str, etag: str) -> Optional[str]:
+        """
+        Look up a cached copy of an object.
+
+        Args:
+            s3_path (str): The S3 key of the object
+            etag (str): The current ETag of the object
+
+        Returns:
+            Optional[str]: Local path of the cached file, or None on a miss
+        """
+        return self._lookup(self._entry_path(s3_path, etag))
+
+    def put(self, s3_path: str, etag: str, download: Callable[[Any], None]) -> str:
+        """
+        Download an object into the cache.
+
+        Args:
+            s3_path (str): The S3 key of the object
+            etag (str): The current ETag of the object
+            download (Callable): Function that writes the object into the given file handle
+
+        Returns:
+            str: Local path of the cached file
+        """
+
+        def write(temp_path: str) -> None:
+            with open(temp_path, "wb") as temp_file:
+                download(temp_file)
+
+        path = self._write_entry(self._entry_path(s3_path, etag), write)
+        self._remove_entries(f"{self._key_prefix(s3_path)}_", keep=path)
+        self.evict()
+        return path
+
+
+_parquet_cache = None
+_parquet_cache_lock = threading.Lock()
+
+
+def get_parquet_cache() -> Optional[ParquetDiskCache]:
+    """
+    Get the process-wide Parquet disk cache.
+
+    Returns:
+        Optional[ParquetDiskCache]: The cache, or None if caching is disabled
+    """
+    global _parquet_cache
+
+    if settings.PARQUET_CACHE_MAX_BYTES <= 0:
+        return None
+
+    if _parquet_cache is None:
+        with _parquet_cache_lock:
+            if _parquet_cache is None:
+                _parquet_cache = ParquetDiskCache(settings.PARQUET_CACHE_DIR, settings.PARQUET_CACHE_MAX_BYTES)
+    return _parquet_cache
+
+
+def get_parquet_cache_stats() -> Dict[str, Any]:
+    """
+    Get statistics for the Parquet disk cache.
+
+    Returns:
+        Dict[str, Any]: Cache statistics, or {"enabled": False} if caching is disabled
+    """
+    cache = get_parquet_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
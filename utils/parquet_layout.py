@@ -0,0 +1,121 @@
+from typing import Any, Dict, List, Optional
+
+import polars as pl
+
+from django.conf import settings
+
+from utils.aggregate import estimate_row_bytes
+
+# Bounds on the number of rows per row group
+MIN_ROW_GROUP_ROWS = 16 * 1024
+MAX_ROW_GROUP_ROWS = 1024 * 1024
+
+
+def choose_parquet_layout(schema: Dict[str, pl.DataType], cluster_by: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Choose the row-group size and sort order for writing a dataset to Parquet.
+
+    Row groups are sized so that each holds roughly PARQUET_ROW_GROUP_TARGET_BYTES of
+    uncompressed data for the dataset's row width. Rows are clustered by the chosen
+    column, or by the first date column when PARQUET_CLUSTER_BY_DATE is enabled, so
+    the min/max statistics of each row group cover a narrow range and filtered
+    reads can skip most row groups.
+
+    Args:
+        schema (Dict[str, pl.DataType]): The schema of the dataset, after type conversion
+        cluster_by (str, optional): A column to cluster rows by, typically a low-cardinality one
+
+    Returns:
+        Dict[str, Any]: The layout, with 'row_group_size', 'sort_by' and 'statistics'
+    """
+    row_bytes = max(estimate_row_bytes(schema), 1)
+    row_group_size = settings.PARQUET_ROW_GROUP_TARGET_BYTES // row_bytes
+    row_group_size = max(MIN_ROW_GROUP_ROWS, min(MAX_ROW_GROUP_ROWS, row_group_size))
+
+    sort_by = None
+    if cluster_by and cluster_by not in schema:
+        print(f"Cannot cluster by '{cluster_by}': column not found in dataset, ignoring")
+        cluster_by = None
+
+    if cluster_by:
+        sort_by = cluster_by
+    elif settings.PARQUET_CLUSTER_BY_DATE:
+        sort_by = next((col for col, dtype in schema.items() if dtype in (pl.Date, pl.Datetime)), None)
+
+    return {"row_group_size": row_group_size, "sort_by": sort_by, "statistics": True}
+
+
+def apply_parquet_layout(df, layout: Dict[str, Any]):
+    """
+    Apply the sort order of a layout to a DataFrame or LazyFrame.
+
+    Args:
+        df (Union[pl.DataFrame, pl.LazyFrame]): The data to write
+        layout (Dict[str, Any]): The layout returned by choose_parquet_layout
+
+    Returns:
+        Union[pl.DataFrame, pl.LazyFrame]: The data in write order
+    """
+    if layout.get("sort_by"):
+        return df.sort(layout["sort_by"], nulls_last=True)
+    return df
+
+
+def parquet_write_options(layout: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Translate a layout into keyword arguments for write_parquet / sink_parquet.
+
+    Args:
+        layout (Dict[str, Any]): The layout returned by choose_parquet_layout
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for the Polars Parquet writer
+    """
+    return {
+        "compression": "snappy",
+        "row_group_size": layout["row_group_size"],
+        "statistics": layout["statistics"],
+    }
+
+
+def parquet_layout_issues(file_path: str, layout: Dict[str, Any]) -> List[str]:
+    """
+    Check whether an uploaded Parquet file can be stored as is instead of being rewritten.
+
+    The file is kept when its row groups are within the row-group bounds, every column
+    chunk has statistics, and its rows are already clustered by the layout's sort
+    column. Row-group metadata is read from the file footer with pyarrow.
+
+    Args:
+        file_path (str): The local path to the Parquet file
+        layout (Dict[str, Any]): The layout returned by choose_parquet_layout
+
+    Returns:
+        List[str]: Reasons the file needs rewriting, empty if its layout is fine
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return ["row-group metadata cannot be read without pyarrow"]
+
+    issues = []
+    metadata = pq.read_metadata(file_path)
+    row_groups = [metadata.row_group(i) for i in range(metadata.num_row_groups)]
+
+    if any(row_group.num_rows > MAX_ROW_GROUP_ROWS for row_group in row_groups):
+        issues.append(f"row groups larger than {MAX_ROW_GROUP_ROWS} rows")
+    if len(row_groups) > 1 and metadata.num_rows / len(row_groups) < MIN_ROW_GROUP_ROWS:
+        issues.append(f"row groups smaller than {MIN_ROW_GROUP_ROWS} rows on average")
+    if any(
+        not row_group.column(i).is_stats_set for row_group in row_groups for i in range(row_group.num_columns)
+    ):
+        issues.append("column statistics missing")
+
+    sort_by = layout.get("sort_by")
+    if sort_by:
+        # Only the sort column is read to check the row order
+        column = pl.scan_parquet(file_path).select(sort_by).collect().to_series()
+        if not (column.drop_nulls().is_sorted() and column.is_null().is_sorted()):
+            issues.append(f"rows not clustered by '{sort_by}'")
+
+    return issues
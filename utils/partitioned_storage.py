@@ -0,0 +1,291 @@
+import os
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Union
+from zoneinfo import ZoneInfo
+
+import polars as pl
+
+from django.conf import settings
+
+# Hive partition directory used for rows whose date is null
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def choose_partition_column(
+    schema: Dict[str, pl.DataType], file_size: int, layout: Dict[str, Any], partition_by_date: Optional[bool] = None
+) -> Optional[str]:
+    """
+    Decide whether a dataset is stored as a year/month partitioned directory.
+
+    Args:
+        schema (Dict[str, pl.DataType]): The schema of the dataset, after type conversion
+        file_size (int): Size in bytes of the uploaded file
+        layout (Dict[str, Any]): The Parquet layout returned by choose_parquet_layout
+        partition_by_date (bool, optional): Force partitioning on or off, overriding
+            PARTITIONED_STORAGE_MIN_BYTES
+
+    Returns:
+        Optional[str]: The date column to partition by, or None to store a single file
+    """
+    if partition_by_date is None:
+        threshold = settings.PARTITIONED_STORAGE_MIN_BYTES
+        partition_by_date = threshold > 0 and file_size >= threshold
+    if not partition_by_date:
+        return None
+
+    date_columns = [col for col, dtype in schema.items() if dtype in (pl.Date, pl.Datetime)]
+    if not date_columns:
+        return None
+
+    # Prefer the column the rows are clustered by, so each partition is a contiguous range
+    if layout.get("sort_by") in date_columns:
+        return layout["sort_by"]
+    return date_columns[0]
+
+
+def get_partition_s3_path(s3_prefix: str, year: Optional[int], month: Optional[int]) -> str:
+    """
+    Get the S3 key of one partition of a partitioned dataset.
+
+    Args:
+        s3_prefix (str): The S3 prefix of the dataset, e.g. 'datasets/events'
+        year (int, optional): The partition year, or None for rows without a date
+        month (int, optional): The partition month, or None for rows without a date
+
+    Returns:
+        str: The S3 key of the partition's Parquet file
+    """
+    year_value = NULL_PARTITION if year is None else str(year)
+    month_value = NULL_PARTITION if month is None else f"{month:02d}"
+    return f"{s3_prefix}/year={year_value}/month={month_value}/part-0.parquet"
+
+
+def write_partitioned_parquet(
+    df: Union[pl.DataFrame, pl.LazyFrame],
+    date_column: str,
+    s3_prefix: str,
+    write_options: Dict[str, Any],
+    sort_by: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Write a dataset to the storage backend as one Parquet file per year/month of a date column.
+
+    An in-memory DataFrame is split into its partitions in a single pass. A LazyFrame is
+    first spooled to a temporary file sorted by month, unless it is already sorted by the
+    date column, so that each partition's range filter reads only the row groups holding
+    that month instead of the whole dataset. Each partition is written to a temporary file
+    with the streaming engine and uploaded to the storage backend, so memory stays bounded
+    by a single partition.
+
+    Args:
+        df (Union[pl.DataFrame, pl.LazyFrame]): The dataset, already in write order
+        date_column (str): The date column to partition by
+        s3_prefix (str): The S3 prefix to write partitions under
+        write_options (Dict[str, Any]): Keyword arguments for sink_parquet
+        sort_by (str, optional): The column the dataset is sorted by, see choose_parquet_layout;
+            rows keep this order within each partition
+
+    Returns:
+        List[Dict[str, Any]]: The partition manifest, one entry per written partition
+    """
+    from utils.storage import get_storage_backend
+
+    storage = get_storage_backend()
+    year = pl.col(date_column).dt.year()
+    month = pl.col(date_column).dt.month()
+
+    spool_path = None
+    try:
+        if isinstance(df, pl.DataFrame):
+            frames = df.with_columns(year.alias("__year"), month.alias("__month")).partition_by(
+                "__year", "__month", maintain_order=True, include_key=False, as_dict=True
+            )
+            parts = [(key, frame) for key, frame in sorted(frames.items(), key=lambda item: _partition_order(item[0]))]
+        else:
+            lf = df
+            if sort_by != date_column:
+                fd, spool_path = tempfile.mkstemp(suffix=".parquet")
+                os.close(fd)
+                # Months become contiguous runs of row groups and rows keep their clustering within each month
+                sort_keys = [year, month] + ([pl.col(sort_by)] if sort_by else [])
+                lf.sort(sort_keys, maintain_order=True).sink_parquet(spool_path, **write_options)
+                lf = pl.scan_parquet(spool_path)
+            dtype = lf.collect_schema()[date_column]
+
+            keys = lf.select(year.alias("year"), month.alias("month")).unique().collect()
+            parts = [
+                (
+                    (key["year"], key["month"]),
+                    lf.filter(_partition_predicate(date_column, dtype, key["year"], key["month"])),
+                )
+                for key in sorted(
+                    keys.iter_rows(named=True), key=lambda key: _partition_order((key["year"], key["month"]))
+                )
+            ]
+
+        partitions = []
+        for (part_year, part_month), part in parts:
+            s3_path = get_partition_s3_path(s3_prefix, part_year, part_month)
+            fd, part_path = tempfile.mkstemp(suffix=".parquet")
+            os.close(fd)
+            try:
+                if isinstance(part, pl.DataFrame):
+                    part.write_parquet(part_path, **write_options)
+                else:
+                    part.sink_parquet(part_path, **write_options)
+                num_rows = pl.scan_parquet(part_path).select(pl.len()).collect().item()
+                storage.upload_file(part_path, s3_path)
+            finally:
+                os.remove(part_path)
+
+            print(f"Uploaded partition {s3_path} ({num_rows} rows)")
+            partitions.append({"year": part_year, "month": part_month, "s3_path": s3_path, "num_rows": num_rows})
+        return partitions
+    finally:
+        if spool_path is not None:
+            os.remove(spool_path)
+
+
+def _partition_order(key: tuple) -> tuple:
+    # The null partition first, then months in order
+    return (key[0] is not None, key)
+
+
+def _partition_predicate(date_column: str, dtype: pl.DataType, year: Optional[int], month: Optional[int]) -> pl.Expr:
+    if year is None:
+        return pl.col(date_column).is_null()
+    # A range on the raw column lets the scan skip row groups by their min/max statistics
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return (pl.col(date_column) >= _month_start(dtype, year, month)) & (
+        pl.col(date_column) < _month_start(dtype, next_year, next_month)
+    )
+
+
+def _month_start(dtype: pl.DataType, year: int, month: int) -> Union[date, pl.Expr]:
+    # The first instant of a month, in the date column's own type and time zone
+    return _time_bound(dtype, date(year, month, 1))
+
+
+def _time_bound(dtype: pl.DataType, value: Union[date, datetime]) -> Union[date, pl.Expr]:
+    # A literal of the column's own type: naive values are wall-clock time in the column's time zone and
+    # aware values keep their instant. It is built in Python so the scan can compare it with row-group statistics
+    if dtype == pl.Date:
+        return value.date() if isinstance(value, datetime) else value
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None and dtype.time_zone:
+        value = value.replace(tzinfo=ZoneInfo(dtype.time_zone))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    # Casting the epoch offset folds into a plain literal, which a literal with a time zone does not
+    micros = (value - datetime(1970, 1, 1)) // timedelta(microseconds=1)
+    epoch = {"ms": micros // 1000, "us": micros, "ns": micros * 1000}[dtype.time_unit]
+    return pl.lit(epoch, dtype=pl.Int64).cast(pl.Datetime(dtype.time_unit, dtype.time_zone))
+
+
+def _to_month(value: Union[str, date, datetime, None]) -> Optional[tuple]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return (value.year, value.month)
+
+
+def select_partitions(partitions: List[Dict[str, Any]], start=None, end=None) -> List[Dict[str, Any]]:
+    """
+    Select the partitions that can contain rows within a time range.
+
+    Args:
+        partitions (List[Dict[str, Any]]): The partition manifest of the dataset
+        start (Union[str, date, datetime], optional): Inclusive start of the range
+        end (Union[str, date, datetime], optional): Inclusive end of the range
+
+    Returns:
+        List[Dict[str, Any]]: The partitions to scan
+    """
+    start_month = _to_month(start)
+    end_month = _to_month(end)
+    if start_month is None and end_month is None:
+        return partitions
+
+    selected = []
+    for partition in partitions:
+        # Rows without a date never fall inside a time range
+        if partition["year"] is None:
+            continue
+        month = (partition["year"], partition["month"])
+        if start_month is not None and month < start_month:
+            continue
+        if end_month is not None and month > end_month:
+            continue
+        selected.append(partition)
+    return selected
+
+
+def scan_partitioned_dataset(file_info: Dict[str, Any], start=None, end=None) -> pl.LazyFrame:
+    """
+    Lazily scan the partitions of a partitioned dataset that overlap a time range.
+
+    Args:
+        file_info (Dict[str, Any]): The dataset's file_info metadata, including its partitions
+        start (Union[str, date, datetime], optional): Inclusive start of the range
+        end (Union[str, date, datetime], optional): Inclusive end of the range
+
+    Returns:
+        pl.LazyFrame: A LazyFrame over the selected partitions
+    """
+    from utils.storage import get_storage_backend
+
+    storage = get_storage_backend()
+    partitions = select_partitions(file_info["partitions"], start, end)
+    print(f"Scanning {len(partitions)} of {len(file_info['partitions'])} partitions of {file_info['s3_path']}")
+
+    if not partitions:
+        # Keep the schema so downstream column validation still works
+        return storage.scan_parquet(file_info["partitions"][0]["s3_path"]).head(0)
+
+    return storage.scan_parquet([partition["s3_path"] for partition in partitions])
+
+
+def time_range_expression(column: str, dtype: pl.DataType, start=None, end=None) -> Optional[pl.Expr]:
+    """
+    Build a row filter for a time range on a date column.
+
+    Args:
+        column (str): The date column
+        dtype (pl.DataType): The column's data type
+        start (Union[str, date, datetime], optional): Inclusive start of the range
+        end (Union[str, date, datetime], optional): Inclusive end of the range. A date without a
+            time includes that whole day, also on a datetime column
+
+    Returns:
+        Optional[pl.Expr]: The filter expression, or None if the range is open on both ends
+    """
+    bounds = []
+    end_is_day = False
+    for value in (start, end):
+        if isinstance(value, str) and value:
+            is_day = len(value) == 10
+            value = datetime.fromisoformat(value)
+        else:
+            is_day = isinstance(value, date) and not isinstance(value, datetime)
+        bounds.append(None if value in (None, "") else value)
+        end_is_day = is_day
+
+    start_value, end_value = bounds
+    if start_value is None and end_value is None:
+        return None
+
+    conditions = []
+    if start_value is not None:
+        conditions.append(pl.col(column) >= _time_bound(dtype, start_value))
+    if end_value is not None:
+        if dtype != pl.Date and end_is_day:
+            # Rows later on the end day are still inside the range
+            end_day = datetime(end_value.year, end_value.month, end_value.day)
+            conditions.append(pl.col(column) < _time_bound(dtype, end_day + timedelta(days=1)))
+        else:
+            conditions.append(pl.col(column) <= _time_bound(dtype, end_value))
+    return conditions[0] if len(conditions) == 1 else conditions[0] & conditions[1]
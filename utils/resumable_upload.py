@@ -0,0 +1,280 @@
+import base64
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+
+UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# Bytes read from the request body at a time while writing a chunk
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class ChecksumMismatchError(ValueError):
+    """
+    Raised when a received chunk does not match the checksum sent with it.
+    """
+
+
+class ResumableUploadStore:
+    """
+    On-disk store for resumable, chunked uploads, modelled on the tus protocol.
+
+    A session fixes the file size and chunk size up front. Every chunk is written in
+    place into a preallocated file at its own offset, so chunks can arrive in any
+    order, in parallel and from different worker processes. A chunk counts as
+    received only after its bytes are flushed to disk, which is recorded by a marker
+    file holding its SHA-256. No shared state is rewritten, so no locking is needed.
+    """
+
+    def __init__(self, root: str, chunk_size: int):
+        self.root = root
+        self.chunk_size = chunk_size
+        os.makedirs(self.root, exist_ok=True)
+
+    def _session_dir(self, upload_id: str) -> str:
+        if not UPLOAD_ID_PATTERN.match(upload_id):
+            raise FileNotFoundError(f"Upload {upload_id} not found")
+        return os.path.join(self.root, upload_id)
+
+    def _data_path(self, upload_id: str) -> str:
+        return os.path.join(self._session_dir(upload_id), "data")
+
+    def _marker_path(self, upload_id: str, index: int) -> str:
+        return os.path.join(self._session_dir(upload_id), "chunks", f"{index}.sha256")
+
+    def create(self, filename: str, size: int) -> Dict[str, Any]:
+        """
+        Start an upload session.
+
+        Args:
+            filename (str): Cleaned name of the file being uploaded
+            size (int): Size of the file in bytes
+
+        Returns:
+            Dict[str, Any]: The session, with its upload id, chunk size and chunk count
+        """
+        upload_id = uuid.uuid4().hex
+        session_dir = self._session_dir(upload_id)
+        os.makedirs(os.path.join(session_dir, "chunks"))
+
+        # Preallocate the file so chunks can be written at any offset
+        with open(self._data_path(upload_id), "wb") as f:
+            f.truncate(size)
+
+        manifest = {
+            "upload_id": upload_id,
+            "filename": filename,
+            "size": size,
+            "chunk_size": self.chunk_size,
+            "chunk_count": max(1, -(-size // self.chunk_size)),
+            "created": time.time(),
+        }
+        with open(os.path.join(session_dir, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+        return manifest
+
+    def get(self, upload_id: str) -> Dict[str, Any]:
+        """
+        Get the manifest of an upload session.
+
+        Args:
+            upload_id (str): The upload id
+
+        Returns:
+            Dict[str, Any]: The session manifest
+
+        Raises:
+            FileNotFoundError: If the session does not exist
+        """
+        with open(os.path.join(self._session_dir(upload_id), "manifest.json")) as f:
+            return json.load(f)
+
+    def _chunk_length(self, manifest: Dict[str, Any], index: int) -> int:
+        offset = index * manifest["chunk_size"]
+        return min(manifest["chunk_size"], manifest["size"] - offset)
+
+    def received_chunks(self, upload_id: str):
+        """
+        Get the indexes of the chunks received so far.
+
+        Args:
+            upload_id (str): The upload id
+
+        Returns:
+            List[int]: Sorted chunk indexes
+        """
+        chunk_dir = os.path.join(self._session_dir(upload_id), "chunks")
+        return sorted(int(name.split(".")[0]) for name in os.listdir(chunk_dir) if name.endswith(".sha256"))
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        """
+        Get the progress of an upload session.
+
+        The offset is the number of bytes received contiguously from the start of the
+        file, as in tus; the chunk lists allow resuming out-of-order uploads exactly.
+
+        Args:
+            upload_id (str): The upload id
+
+        Returns:
+            Dict[str, Any]: The manifest plus the offset and the received and missing chunks
+        """
+        manifest = self.get(upload_id)
+        received = self.received_chunks(upload_id)
+        received_set = set(received)
+
+        contiguous = 0
+        while contiguous in received_set:
+            contiguous += 1
+        offset = min(contiguous * manifest["chunk_size"], manifest["size"])
+
+        return {
+            **manifest,
+            "offset": offset,
+            "received_chunks": received,
+            "missing_chunks": [index for index in range(manifest["chunk_count"]) if index not in received_set],
+        }
+
+    def write_chunk(self, upload_id: str, index: int, stream, checksum: Optional[str] = None) -> None:
+        """
+        Write one chunk of an upload from a readable stream.
+
+        Args:
+            upload_id (str): The upload id
+            index (int): Zero-based index of the chunk
+            stream: Readable binary stream with the chunk's bytes
+            checksum (str, optional): Expected checksum as "sha256 <base64 digest>", as in the
+                tus Upload-Checksum header
+
+        Raises:
+            FileNotFoundError: If the session does not exist
+            ValueError: If the index or the chunk length is invalid
+            ChecksumMismatchError: If the chunk does not match its checksum
+        """
+        manifest = self.get(upload_id)
+        if index < 0 or index >= manifest["chunk_count"]:
+            raise ValueError(f"Chunk index {index} is out of range 0-{manifest['chunk_count'] - 1}")
+
+        expected_length = self._chunk_length(manifest, index)
+        digest = hashlib.sha256()
+        length = 0
+
+        # A retried chunk overwrites the bytes of the previous attempt in place, so it stops
+        # counting as received until the new bytes are validated
+        marker_path = self._marker_path(upload_id, index)
+        try:
+            os.remove(marker_path)
+        except FileNotFoundError:
+            pass
+
+        fd = os.open(self._data_path(upload_id), os.O_WRONLY)
+        try:
+            offset = index * manifest["chunk_size"]
+            while True:
+                block = stream.read(READ_BLOCK_SIZE)
+                if not block:
+                    break
+                length += len(block)
+                if length > expected_length:
+                    raise ValueError(f"Chunk {index} is larger than {expected_length} bytes")
+                digest.update(block)
+                os.pwrite(fd, block, offset)
+                offset += len(block)
+
+            if length != expected_length:
+                raise ValueError(f"Chunk {index} has {length} bytes, expected {expected_length}")
+
+            if checksum:
+                algorithm, _, expected = checksum.partition(" ")
+                if algorithm.lower() != "sha256":
+                    raise ValueError(f"Unsupported checksum algorithm: {algorithm}")
+                if base64.b64decode(expected) != digest.digest():
+                    raise ChecksumMismatchError(f"Checksum mismatch for chunk {index}")
+
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        # Mark the chunk as received only once its bytes are on disk
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(marker_path), suffix=".part")
+        with os.fdopen(fd, "w") as f:
+            f.write(digest.hexdigest())
+        os.replace(temp_path, marker_path)
+
+    def finalize(self, upload_id: str, destination_dir: str) -> str:
+        """
+        Assemble a completed upload into a file ready for processing and end the session.
+
+        Args:
+            upload_id (str): The upload id
+            destination_dir (str): Directory to move the assembled file into
+
+        Returns:
+            str: The path of the assembled file
+
+        Raises:
+            FileNotFoundError: If the session does not exist
+            ValueError: If chunks are still missing
+        """
+        status = self.status(upload_id)
+        if status["missing_chunks"]:
+            raise ValueError(f"Upload is incomplete, {len(status['missing_chunks'])} chunks are missing")
+
+        os.makedirs(destination_dir, exist_ok=True)
+        fd, file_path = tempfile.mkstemp(dir=destination_dir, suffix=f"_{status['filename']}")
+        os.close(fd)
+        shutil.move(self._data_path(upload_id), file_path)
+        self.abort(upload_id)
+        return file_path
+
+    def abort(self, upload_id: str) -> None:
+        """
+        Delete an upload session and everything received for it.
+
+        Args:
+            upload_id (str): The upload id
+        """
+        shutil.rmtree(self._session_dir(upload_id), ignore_errors=True)
+
+    def cleanup_stale(self, max_age_seconds: int) -> int:
+        """
+        Delete sessions that were started longer ago than max_age_seconds.
+
+        Args:
+            max_age_seconds (int): Maximum age of a session
+
+        Returns:
+            int: Number of sessions deleted
+        """
+        removed = 0
+        cutoff = time.time() - max_age_seconds
+        for name in os.listdir(self.root):
+            if not UPLOAD_ID_PATTERN.match(name):
+                continue
+            try:
+                if self.get(name)["created"] < cutoff:
+                    self.abort(name)
+                    removed += 1
+            except (FileNotFoundError, ValueError, KeyError):
+                continue
+        return removed
+
+
+def get_resumable_upload_store() -> ResumableUploadStore:
+    """
+    Get the resumable upload store.
+
+    Returns:
+        ResumableUploadStore: The store, under UPLOAD_TEMP_DIR
+    """
+    return ResumableUploadStore(
+        os.path.join(settings.UPLOAD_TEMP_DIR, "resumable"), settings.RESUMABLE_UPLOAD_CHUNK_SIZE
+    )
@@ -0,0 +1,62 @@
+"""
+S3 client construction shared by the Django app and the standalone scripts.
+
+This module deliberately does not import Django settings, so the scripts in
+scripts/ can build clients with exactly the same configuration.
+"""
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.client import Config
+
+MB = 1024 * 1024
+
+
+def build_s3_client(
+    access_key_id, secret_access_key, endpoint_url, region_name="us-east-1", max_pool_connections=32
+):
+    """
+    Create an S3 client with connection pooling and keep-alive enabled.
+
+    Args:
+        access_key_id (str): S3 access key
+        secret_access_key (str): S3 secret key
+        endpoint_url (str): S3/Minio endpoint URL
+        region_name (str): Region used for request signing
+        max_pool_connections (int): Size of the client's HTTP connection pool
+
+    Returns:
+        botocore.client.S3: The S3 client
+    """
+    session = boto3.Session(aws_access_key_id=access_key_id, aws_secret_access_key=secret_access_key)
+    config = Config(
+        signature_version="s3v4",
+        retries={
+            "total_max_attempts": 3,  # Retry up to 3 times for faster error handling
+            "mode": "standard",  # Standard retry mode for quicker retries
+        },
+        read_timeout=200,
+        max_pool_connections=max_pool_connections,
+        tcp_keepalive=True,
+    )
+    return session.client("s3", endpoint_url=endpoint_url, region_name=region_name, config=config)
+
+
+def build_transfer_config(multipart_threshold=8 * MB, multipart_chunksize=8 * MB, max_concurrency=10):
+    """
+    Create the transfer configuration used for managed uploads and downloads.
+
+    Args:
+        multipart_threshold (int): Size in bytes above which multipart transfers are used
+        multipart_chunksize (int): Size in bytes of each part
+        max_concurrency (int): Number of parts transferred concurrently
+
+    Returns:
+        TransferConfig: The transfer configuration
+    """
+    return TransferConfig(
+        multipart_threshold=multipart_threshold,
+        multipart_chunksize=multipart_chunksize,
+        max_concurrency=max_concurrency,
+        use_threads=max_concurrency > 1,
+    )
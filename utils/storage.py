@@ -0,0 +1,346 @@
+import os
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from io import BytesIO
+from typing import List, Optional, Union
+
+import polars as pl
+
+from django.conf import settings
+
+
+class SpooledUploadWriter:
+    """
+    Writable file object that spools to a local temporary file and commits it on close.
+
+    Used by backends without a streaming upload API. Use it as a context manager: the
+    file is committed on a clean exit and discarded if an exception is raised.
+    """
+
+    def __init__(self, commit, dir=None):
+        self._commit = commit
+        fd, self.path = tempfile.mkstemp(suffix=".part", dir=dir)
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, data):
+        return self._file.write(data)
+
+    def writable(self):
+        return True
+
+    def flush(self):
+        self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._file.close()
+        try:
+            if exc_type is None:
+                self._commit(self.path)
+        finally:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        return False
+
+
+class StorageBackend(ABC):
+    """
+    Object storage used for converted datasets.
+
+    Keys are '/'-separated paths such as 'datasets/sales.parquet', the same on every
+    backend, so datasets can be moved between backends without rewriting metadata.
+    Subclasses implement the abstract methods; local_path and scan_parquet have
+    defaults that suit remote backends.
+    """
+
+    name = None
+
+    @abstractmethod
+    def upload_file(self, file_path: str, key: str) -> None:
+        """
+        Upload a local file.
+
+        Args:
+            file_path (str): The local path to the file
+            key (str): The key to store the file under
+        """
+
+    @abstractmethod
+    def open_writer(self, key: str):
+        """
+        Open a writable file object that stores its contents under a key.
+
+        Args:
+            key (str): The key to store the data under
+
+        Returns:
+            A writable file object; use it as a context manager
+        """
+
+    @abstractmethod
+    def download(self, key: str, fileobj) -> None:
+        """
+        Download an object into a writable binary file object.
+
+        Args:
+            key (str): The key of the object
+            fileobj: The file object to write to
+        """
+
+    @abstractmethod
+    def get_version(self, key: str) -> str:
+        """
+        Get a token that changes whenever the object is overwritten, e.g. its ETag.
+
+        Args:
+            key (str): The key of the object
+
+        Returns:
+            str: The version token
+        """
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Delete an object, ignoring objects that do not exist.
+
+        Args:
+            key (str): The key of the object
+        """
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """
+        Get a URL identifying the object.
+
+        Args:
+            key (str): The key of the object
+
+        Returns:
+            str: The URL
+        """
+
+    def local_path(self, key: str) -> Optional[str]:
+        """
+        Get the local filesystem path of an object, for backends that store files locally.
+
+        Args:
+            key (str): The key of the object
+
+        Returns:
+            Optional[str]: The path, or None for remote backends
+        """
+        return None
+
+    def scan_parquet(self, keys: Union[str, List[str]]) -> pl.LazyFrame:
+        """
+        Lazily scan one or more Parquet objects.
+
+        The default implementation downloads each object into memory. Backends that
+        Polars can read natively override this so that projection and predicate
+        pushdown reach the storage.
+
+        Args:
+            keys (Union[str, List[str]]): The key or keys of the Parquet objects
+
+        Returns:
+            pl.LazyFrame: A LazyFrame over the objects
+        """
+        frames = []
+        for key in [keys] if isinstance(keys, str) else keys:
+            buffer = BytesIO()
+            self.download(key, buffer)
+            buffer.seek(0)
+            frames.append(pl.scan_parquet(buffer))
+        return frames[0] if len(frames) == 1 else pl.concat(frames, how="vertical")
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    S3/Minio storage, using the pooled client and parallel multipart uploads.
+    """
+
+    name = "s3"
+
+    def upload_file(self, file_path, key):
+        from utils.aws_config import upload_file_multipart
+
+        upload_file_multipart(file_path, key)
+
+    def open_writer(self, key):
+        from utils.aws_config import open_multipart_upload
+
+        return open_multipart_upload(key)
+
+    def download(self, key, fileobj):
+        from utils.aws_config import get_boto_client, get_transfer_config
+
+        get_boto_client().download_fileobj(settings.AWS_BUCKET, key, fileobj, Config=get_transfer_config())
+
+    def get_version(self, key):
+        from utils.aws_config import get_boto_client
+
+        return get_boto_client().head_object(Bucket=settings.AWS_BUCKET, Key=key)["ETag"]
+
+    def delete(self, key):
+        from utils.aws_config import get_boto_client
+
+        get_boto_client().delete_object(Bucket=settings.AWS_BUCKET, Key=key)
+
+    def url(self, key):
+        return f"{settings.AWS_ENDPOINT}/{settings.AWS_BUCKET}/{key}"
+
+    def scan_parquet(self, keys):
+        from utils.aws_config import get_s3_storage_options
+
+        # Polars reads the footer first and fetches only the needed column chunks with ranged GETs
+        if isinstance(keys, str):
+            source = f"s3://{settings.AWS_BUCKET}/{keys}"
+        else:
+            source = [f"s3://{settings.AWS_BUCKET}/{key}" for key in keys]
+        return pl.scan_parquet(source, storage_options=get_s3_storage_options())
+
+
+class B2StorageBackend(StorageBackend):
+    """
+    Backblaze B2 storage through the native B2 API.
+
+    The account is authorized on first use rather than at import time, so processes
+    that never touch B2 do not pay for the handshake.
+    """
+
+    name = "b2"
+
+    def __init__(self):
+        self._bucket = None
+        self._lock = threading.Lock()
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            with self._lock:
+                if self._bucket is None:
+                    from utils.backblaze import get_b2_api
+
+                    self._bucket = get_b2_api().get_bucket_by_name(settings.BACKBLAZE_BUCKET)
+        return self._bucket
+
+    def upload_file(self, file_path, key):
+        self.bucket.upload_local_file(local_file=file_path, file_name=key)
+
+    def open_writer(self, key):
+        return SpooledUploadWriter(lambda path: self.upload_file(path, key))
+
+    def download(self, key, fileobj):
+        self.bucket.download_file_by_name(key).save(fileobj)
+
+    def get_version(self, key):
+        return self.bucket.get_file_info_by_name(key).id_
+
+    def delete(self, key):
+        for version in self.bucket.list_file_versions(key):
+            if version.file_name == key:
+                self.bucket.delete_file_version(version.id_, version.file_name)
+
+    def url(self, key):
+        # The download host depends on the account's cluster and is returned by the authorization
+        return self.bucket.get_download_url(key)
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Storage on the local filesystem, for development, tests and benchmarks.
+
+    Writes go to a temporary file that is atomically renamed into place, so readers
+    never see a partial object. Parquet files are read straight from disk, which lets
+    Polars memory-map them instead of copying them into memory.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def local_path(self, key):
+        path = os.path.abspath(os.path.join(self.root, key))
+        if os.path.commonpath([path, self.root]) != self.root:
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def _commit(self, temp_path, key):
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(temp_path, path)
+
+    def upload_file(self, file_path, key):
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=".part", dir=os.path.dirname(path))
+        os.close(fd)
+        try:
+            shutil.copyfile(file_path, temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def open_writer(self, key):
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Spool next to the destination so the final rename stays on one filesystem
+        return SpooledUploadWriter(lambda temp_path: self._commit(temp_path, key), dir=os.path.dirname(path))
+
+    def download(self, key, fileobj):
+        with open(self.local_path(key), "rb") as f:
+            shutil.copyfileobj(f, fileobj)
+
+    def get_version(self, key):
+        stat = os.stat(self.local_path(key))
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def delete(self, key):
+        try:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+    def url(self, key):
+        return f"file://{self.local_path(key)}"
+
+    def scan_parquet(self, keys):
+        if isinstance(keys, str):
+            return pl.scan_parquet(self.local_path(keys))
+        return pl.scan_parquet([self.local_path(key) for key in keys])
+
+
+_storage_backend = None
+_storage_backend_lock = threading.Lock()
+
+
+def get_storage_backend() -> StorageBackend:
+    """
+    Get the process-wide storage backend selected by the STORAGE_BACKEND setting.
+
+    Returns:
+        StorageBackend: The storage backend
+    """
+    global _storage_backend
+
+    if _storage_backend is None:
+        with _storage_backend_lock:
+            if _storage_backend is None:
+                backend = settings.STORAGE_BACKEND.lower()
+                if backend == "s3":
+                    _storage_backend = S3StorageBackend()
+                elif backend == "b2":
+                    _storage_backend = B2StorageBackend()
+                elif backend == "local":
+                    _storage_backend = LocalStorageBackend(settings.LOCAL_STORAGE_ROOT)
+                else:
+                    raise ValueError(f"Unsupported storage backend: {settings.STORAGE_BACKEND}")
+    return _storage_backend